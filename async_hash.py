@@ -0,0 +1,338 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 14:41:08 2026
+
+@author: Joel Tapia Salvador
+
+Searches of "main_hash" that can be awaited from asyncio, trying the
+candidates in chunks run by an executor so the event loop is never blocked.
+"""
+from __future__ import annotations
+from typing import Callable, Optional, Tuple
+from concurrent.futures import Executor
+import asyncio
+from main_hash import (
+    CHECKPOINT_COLLISION,
+    CHECKPOINT_SECOND_PREIMAGE,
+    CandidateSpace,
+    CompactHashIndex,
+    SearchMonitor,
+    SearchProgress,
+    message_to_bytes,
+    second_preimage_range,
+    uab_md5,
+    uab_md5_bytes,
+    uab_md5_packed,
+)
+
+ASYNC_CHUNK_SIZE = 1 << 16
+
+
+class SearchTimeoutError(TimeoutError):
+    """
+    The time of a search ran out before finding a result.
+
+    Parameters
+    ----------
+    iterations : int
+        Candidates tried before the time ran out.
+
+    """
+
+    def __init__(self, iterations: int):
+        super().__init__(f"Search timed out after {iterations} iterations.")
+        self.iterations = iterations
+
+
+def collision_range(
+    hash_index: CompactHashIndex,
+    space: CandidateSpace,
+    num_bits: int,
+    start: int,
+    stop: int,
+) -> Optional[Tuple[int, int]]:
+    """
+    Tries the candidates with index between start and stop of a birthday
+    collision search, adding their hashes to the table.
+
+    Parameters
+    ----------
+    hash_index : CompactHashIndex
+        Hashes of the candidates tried before, with their indexes.
+    space : CandidateSpace
+        Candidates of the search.
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    start : int
+        Index of the first candidate to try.
+    stop : int
+        Index of the first candidate not to try.
+
+    Returns
+    -------
+    Optional[Tuple[int, int]]
+        Indexes of the two candidates with the same hash, or None if there
+        is no collision yet.
+
+    """
+    for batch_start, batch in space.batches(start, stop, packed=True):
+        for index, hash_val in enumerate(
+            uab_md5_packed(batch, batch.shape[1], num_bits).tolist(),
+            batch_start,
+        ):
+            other_index = hash_index.setdefault(hash_val, index)
+
+            if other_index != index and (
+                num_bits <= 64
+                or uab_md5_bytes(space.candidate(other_index), num_bits)
+                == hash_val
+            ):
+                return other_index, index
+
+    return None
+
+
+async def run_chunk(
+    executor: Optional[Executor],
+    deadline: Optional[float],
+    iterations: int,
+    function: Callable,
+    *arguments,
+):
+    """
+    Runs a chunk of a search in the executor, waiting for it at most until
+    the deadline.
+
+    Parameters
+    ----------
+    executor : Optional[Executor]
+        Executor of the chunk, None for the default one of the event loop.
+    deadline : Optional[float]
+        Time of the event loop when the search times out, None for never.
+    iterations : int
+        Candidates tried before the chunk, for the timeout error.
+    function : Callable
+        Function of the chunk.
+    *arguments
+        Arguments of the function.
+
+    Raises
+    ------
+    SearchTimeoutError
+        The deadline passed before the chunk finished.
+
+    Returns
+    -------
+    object
+        Result of the function.
+
+    """
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(executor, function, *arguments)
+
+    if deadline is None:
+        return await future
+
+    try:
+        return await asyncio.wait_for(future, deadline - loop.time())
+    except asyncio.TimeoutError:
+        raise SearchTimeoutError(iterations) from None
+
+
+async def second_preimage_async(
+    message: str,
+    num_bits: int,
+    timeout: Optional[float] = None,
+    executor: Optional[Executor] = None,
+    chunk_size: int = ASYNC_CHUNK_SIZE,
+    progress: Optional[Callable[[SearchProgress], None]] = None,
+    progress_interval: float = 1.0,
+) -> Optional[Tuple[str, int]]:
+    """
+    Given a message, calculates a new message with the same hash, as
+    "second_preimage", trying the candidates in chunks run by the executor.
+    Only one chunk of every search is waiting in the executor at a time, so
+    concurrent searches take turns. When cancelled or when the timeout runs
+    out the search stops at once, reporting the last progress, and the
+    chunk being run is left to finish on its own.
+
+    Parameters
+    ----------
+    message : str
+        Original message, which we want to find a collission in the hash.
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    timeout : Optional[float], optional
+        Seconds before the search stops. The default is None, no timeout.
+    executor : Optional[Executor], optional
+        Executor of the chunks, threads or processes. The default is None,
+        the default one of the event loop.
+    chunk_size : int, optional
+        Candidates of every chunk. The default is ASYNC_CHUNK_SIZE.
+    progress : Optional[Callable[[SearchProgress], None]], optional
+        Function called with the progress of the search from time to time,
+        and when it is cancelled or times out. The default is None.
+    progress_interval : float, optional
+        Seconds between calls to progress. The default is 1.0.
+
+    Raises
+    ------
+    SearchTimeoutError
+        The timeout ran out, with the number of candidates tried.
+
+    Returns
+    -------
+    Optional[Tuple[str, int]]
+        Tuple including the message we found that has the same hash and the
+        number of iterations needed, the same as "second_preimage". If
+        message not found or error occurred returns None.
+
+    """
+    # pylint: disable=too-many-arguments
+    to_match_hash = uab_md5(message, num_bits)
+    if to_match_hash is None:
+        return None
+
+    message_bytes = message_to_bytes(message)
+    space = CandidateSpace(min_length=1, max_length=10)
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+
+    monitor = None
+    if progress is not None:
+        monitor = SearchMonitor(
+            progress, CHECKPOINT_SECOND_PREIMAGE, num_bits, progress_interval
+        )
+
+    position = 0
+    try:
+        while position < space.number_candidates:
+            stop = min(position + chunk_size, space.number_candidates)
+            index = await run_chunk(
+                executor,
+                deadline,
+                position,
+                second_preimage_range,
+                to_match_hash,
+                message_bytes,
+                num_bits,
+                space,
+                position,
+                stop,
+            )
+
+            if index is not None:
+                return space.candidate(index).decode("latin-1"), index + 1
+
+            position = stop
+            if monitor is not None and position < space.number_candidates:
+                monitor.update(position, space.locate(position)[0])
+    except (asyncio.CancelledError, SearchTimeoutError):
+        if monitor is not None:
+            monitor.update(position, space.locate(position)[0], force=True)
+        raise
+
+    return None
+
+
+async def collision_async(
+    num_bits: int,
+    timeout: Optional[float] = None,
+    chunk_size: int = ASYNC_CHUNK_SIZE,
+    progress: Optional[Callable[[SearchProgress], None]] = None,
+    progress_interval: float = 1.0,
+) -> Optional[Tuple[str, str, int]]:
+    """
+    Given a number of bits of the hash to collision, searches two distinct
+    messages with same hash, as the birthday method of "collision", trying
+    the candidates in chunks run by the default executor of the event loop.
+    The table of the hashes is shared by the chunks, so they run in threads
+    of this process. When cancelled or when the timeout runs out the search
+    stops at once, reporting the last progress, and the chunk being run is
+    left to finish on its own.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    timeout : Optional[float], optional
+        Seconds before the search stops. The default is None, no timeout.
+    chunk_size : int, optional
+        Candidates of every chunk. The default is ASYNC_CHUNK_SIZE.
+    progress : Optional[Callable[[SearchProgress], None]], optional
+        Function called with the progress of the search from time to time,
+        and when it is cancelled or times out. The default is None.
+    progress_interval : float, optional
+        Seconds between calls to progress. The default is 1.0.
+
+    Raises
+    ------
+    SearchTimeoutError
+        The timeout ran out, with the number of candidates tried.
+
+    Returns
+    -------
+    Optional[Tuple[str, str, int]]
+        Tuple including the messages we found that have the same hash and the
+        number of iterations needed, the same as "collision". If messages not
+        found or error occurred returns None.
+
+    """
+    if not isinstance(num_bits, int) or not 1 <= num_bits <= 128:
+        return None
+
+    space = CandidateSpace(min_length=0, max_length=9)
+    hash_index = CompactHashIndex(num_bits)
+    loop = asyncio.get_running_loop()
+    deadline = None if timeout is None else loop.time() + timeout
+
+    monitor = None
+    if progress is not None:
+        monitor = SearchMonitor(
+            progress, CHECKPOINT_COLLISION, num_bits, progress_interval
+        )
+
+    position = 0
+    try:
+        while position < space.number_candidates:
+            stop = min(position + chunk_size, space.number_candidates)
+
+            indexes = await run_chunk(
+                None,
+                deadline,
+                position,
+                collision_range,
+                hash_index,
+                space,
+                num_bits,
+                position,
+                stop,
+            )
+
+            if indexes is not None:
+                return (
+                    space.candidate(indexes[0]).decode("latin-1"),
+                    space.candidate(indexes[1]).decode("latin-1"),
+                    indexes[1] + 1,
+                )
+
+            position = stop
+            if monitor is not None and position < space.number_candidates:
+                monitor.update(
+                    position,
+                    space.locate(position)[0],
+                    len(hash_index),
+                    hash_index.nbytes,
+                )
+    except (asyncio.CancelledError, SearchTimeoutError):
+        if monitor is not None:
+            monitor.update(
+                position,
+                space.locate(position)[0],
+                len(hash_index),
+                hash_index.nbytes,
+                force=True,
+            )
+        raise
+
+    return None
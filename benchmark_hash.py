@@ -0,0 +1,748 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 10:12:45 2026
+
+@author: Joel Tapia Salvador
+
+Benchmarks of the hash and of the searches, repeated and saved to files so
+they can be compared between versions.
+"""
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+import argparse
+import csv
+import json
+import os
+from time import perf_counter
+import numpy as np
+from main_hash import (
+    CandidateSpace,
+    collision,
+    second_preimage,
+    uab_md5,
+    uab_md5_batch,
+    uab_md5_packed,
+)
+
+BENCHMARK_MESSAGE = "This is a benchmark"
+
+BENCHMARK_FIELDS = (
+    "name",
+    "parameter",
+    "trials",
+    "median",
+    "first_quartile",
+    "third_quartile",
+    "hashes",
+    "hashes_per_second",
+)
+
+
+class BenchmarkResult(NamedTuple):
+    """
+    Result of a benchmark, the times are in seconds.
+    """
+
+    name: str
+    parameter: int
+    trials: int
+    median: float
+    first_quartile: float
+    third_quartile: float
+    hashes: int
+    hashes_per_second: float
+
+    @property
+    def interquartile_range(self) -> float:
+        """
+        Interquartile range of the times.
+
+        Returns
+        -------
+        float
+            Third quartile minus first quartile.
+
+        """
+        return self.third_quartile - self.first_quartile
+
+
+def time_trials(
+    function: Callable[[], object], warmups: int = 1, trials: int = 5
+) -> List[float]:
+    """
+    Times a function the given number of trials, after running it the given
+    number of warmups without timing it.
+
+    Parameters
+    ----------
+    function : Callable[[], object]
+        Function to time, called without arguments.
+    warmups : int, optional
+        Number of runs before timing. The default is 1.
+    trials : int, optional
+        Number of timed runs. The default is 5.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    List[float]
+        Seconds of every trial.
+
+    """
+    if not isinstance(warmups, int):
+        raise TypeError("'warmups' is not an integer.")
+
+    if not isinstance(trials, int):
+        raise TypeError("'trials' is not an integer.")
+
+    if warmups < 0:
+        raise ValueError("'warmups' is negative.")
+
+    if trials < 1:
+        raise ValueError("'trials' is not positive.")
+
+    for _ in range(warmups):
+        function()
+
+    times = []
+    for _ in range(trials):
+        start = perf_counter()
+        function()
+        times.append(perf_counter() - start)
+
+    return times
+
+
+def summarize(
+    name: str, parameter: int, times: Sequence[float], hashes: int
+) -> BenchmarkResult:
+    """
+    Summarizes the times of the trials of a benchmark.
+
+    Parameters
+    ----------
+    name : str
+        Name of the benchmark.
+    parameter : int
+        Parameter of the benchmark, message length or number of bits.
+    times : Sequence[float]
+        Seconds of every trial.
+    hashes : int
+        Number of hashes calculated by every trial.
+
+    Returns
+    -------
+    BenchmarkResult
+        Summary of the trials.
+
+    """
+    first_quartile, median, third_quartile = np.percentile(
+        times, [25, 50, 75]
+    ).tolist()
+
+    return BenchmarkResult(
+        name,
+        parameter,
+        len(times),
+        median,
+        first_quartile,
+        third_quartile,
+        hashes,
+        hashes / median if median > 0 else float("inf"),
+    )
+
+
+def benchmark_hash(
+    lengths: Sequence[int] = (0, 64, 1024, 65536),
+    number: int = 1000,
+    warmups: int = 1,
+    trials: int = 5,
+) -> List[BenchmarkResult]:
+    """
+    Benchmarks "uab_md5" hashing one message of every given length, the given
+    number of times every trial.
+
+    Parameters
+    ----------
+    lengths : Sequence[int], optional
+        Lengths of the messages in bytes. The default is (0, 64, 1024, 65536).
+    number : int, optional
+        Hashes every trial of the messages up to 64 bytes, the longer ones
+        are hashed fewer times so every trial hashes about the same bytes.
+        The default is 1000.
+    warmups : int, optional
+        Number of runs before timing. The default is 1.
+    trials : int, optional
+        Number of timed runs. The default is 5.
+
+    Returns
+    -------
+    List[BenchmarkResult]
+        Result for every length.
+
+    """
+    results = []
+
+    for length in lengths:
+        message = bytes(index % 256 for index in range(length))
+        hashes = max(1, number * 64 // max(64, length))
+
+        def run(message: bytes = message, hashes: int = hashes) -> None:
+            for _ in range(hashes):
+                uab_md5(message, 128)
+
+        results.append(
+            summarize(
+                "uab_md5", length, time_trials(run, warmups, trials), hashes
+            )
+        )
+
+    return results
+
+
+def benchmark_batch(
+    lengths: Sequence[int] = (8, 64, 1024),
+    number: int = 8192,
+    warmups: int = 1,
+    trials: int = 5,
+) -> List[BenchmarkResult]:
+    """
+    Benchmarks "uab_md5_batch" and "uab_md5_packed" hashing the given number
+    of messages of every given length at the same time.
+
+    Parameters
+    ----------
+    lengths : Sequence[int], optional
+        Lengths of the messages in bytes. The default is (8, 64, 1024).
+    number : int, optional
+        Messages of every batch. The default is 8192.
+    warmups : int, optional
+        Number of runs before timing. The default is 1.
+    trials : int, optional
+        Number of timed runs. The default is 5.
+
+    Returns
+    -------
+    List[BenchmarkResult]
+        Result for every length, first the batches and then the packed ones.
+
+    """
+    results = []
+
+    for length in lengths:
+        records = np.random.default_rng(length).integers(
+            0, 256, (number, length), dtype=np.uint8
+        )
+        messages = [record.tobytes() for record in records]
+
+        results.append(
+            summarize(
+                "uab_md5_batch",
+                length,
+                time_trials(
+                    lambda messages=messages: uab_md5_batch(messages, 128),
+                    warmups,
+                    trials,
+                ),
+                number,
+            )
+        )
+        results.append(
+            summarize(
+                "uab_md5_packed",
+                length,
+                time_trials(
+                    lambda records=records, length=length: uab_md5_packed(
+                        records, length, 128
+                    ),
+                    warmups,
+                    trials,
+                ),
+                number,
+            )
+        )
+
+    return results
+
+
+def benchmark_second_preimage(
+    widths: Sequence[int] = tuple(range(8, 19, 2)),
+    workers: Optional[int] = None,
+    warmups: int = 1,
+    trials: int = 5,
+) -> List[BenchmarkResult]:
+    """
+    Benchmarks "second_preimage" of the same message for every given number
+    of bits, the hashes are the iterations needed.
+
+    Parameters
+    ----------
+    widths : Sequence[int], optional
+        Numbers of bits. The default is 8, 10, ..., 18.
+    workers : Optional[int], optional
+        Number of processes of the searches. The default is None, searching
+        in this process.
+    warmups : int, optional
+        Number of runs before timing. The default is 1.
+    trials : int, optional
+        Number of timed runs. The default is 5.
+
+    Returns
+    -------
+    List[BenchmarkResult]
+        Result for every number of bits.
+
+    """
+    name = "second_preimage"
+    if workers is not None and workers > 1:
+        name += f"_workers_{workers}"
+
+    results = []
+
+    for num_bits in widths:
+        _, iterations = second_preimage(BENCHMARK_MESSAGE, num_bits)
+
+        results.append(
+            summarize(
+                name,
+                num_bits,
+                time_trials(
+                    lambda num_bits=num_bits: second_preimage(
+                        BENCHMARK_MESSAGE, num_bits, workers=workers
+                    ),
+                    warmups,
+                    trials,
+                ),
+                iterations,
+            )
+        )
+
+    return results
+
+
+def benchmark_collision(
+    widths: Sequence[int] = tuple(range(8, 33, 4)),
+    method: str = "birthday",
+    warmups: int = 1,
+    trials: int = 5,
+) -> List[BenchmarkResult]:
+    """
+    Benchmarks "collision" with the given method for every given number of
+    bits, the hashes are the iterations needed.
+
+    Parameters
+    ----------
+    widths : Sequence[int], optional
+        Numbers of bits. The default is 8, 12, ..., 32.
+    method : str, optional
+        Method of the searches, see "collision". The default is "birthday".
+    warmups : int, optional
+        Number of runs before timing. The default is 1.
+    trials : int, optional
+        Number of timed runs. The default is 5.
+
+    Returns
+    -------
+    List[BenchmarkResult]
+        Result for every number of bits.
+
+    """
+    results = []
+
+    for num_bits in widths:
+        _, _, iterations = collision(num_bits, method)
+
+        results.append(
+            summarize(
+                f"collision_{method}",
+                num_bits,
+                time_trials(
+                    lambda num_bits=num_bits: collision(num_bits, method),
+                    warmups,
+                    trials,
+                ),
+                iterations,
+            )
+        )
+
+    return results
+
+
+def benchmark_candidates(
+    number: int = 1 << 16, warmups: int = 1, trials: int = 5
+) -> List[BenchmarkResult]:
+    """
+    Benchmarks the enumeration of the candidates of the searches, without
+    hashing them.
+
+    Parameters
+    ----------
+    number : int, optional
+        Candidates every trial. The default is 65536.
+    warmups : int, optional
+        Number of runs before timing. The default is 1.
+    trials : int, optional
+        Number of timed runs. The default is 5.
+
+    Returns
+    -------
+    List[BenchmarkResult]
+        Result of the enumeration.
+
+    """
+    space = CandidateSpace(min_length=1, max_length=10)
+
+    def run() -> None:
+        for _ in space.batches(0, number, packed=True):
+            pass
+
+    return [
+        summarize(
+            "candidates", number, time_trials(run, warmups, trials), number
+        )
+    ]
+
+
+def run_benchmarks(
+    max_bits: int = 18,
+    workers: Optional[int] = None,
+    warmups: int = 1,
+    trials: int = 5,
+) -> List[BenchmarkResult]:
+    """
+    Runs every benchmark, the searches up to the given number of bits for
+    the second preimages and twice as many for the collisions.
+
+    Parameters
+    ----------
+    max_bits : int, optional
+        Maximum number of bits of the second preimages. The default is 18.
+    workers : Optional[int], optional
+        Number of processes of the parallel searches, if given they are
+        benchmarked too. The default is None.
+    warmups : int, optional
+        Number of runs before timing. The default is 1.
+    trials : int, optional
+        Number of timed runs. The default is 5.
+
+    Returns
+    -------
+    List[BenchmarkResult]
+        Result of every benchmark.
+
+    """
+    results = (
+        benchmark_hash(warmups=warmups, trials=trials)
+        + benchmark_batch(warmups=warmups, trials=trials)
+        + benchmark_candidates(warmups=warmups, trials=trials)
+        + benchmark_second_preimage(
+            range(2, max_bits + 1, 2), warmups=warmups, trials=trials
+        )
+    )
+
+    if workers is not None and workers > 1:
+        results += benchmark_second_preimage(
+            range(2, max_bits + 1, 2),
+            workers=workers,
+            warmups=warmups,
+            trials=trials,
+        )
+
+    for method in ("birthday", "rho"):
+        results += benchmark_collision(
+            range(4, 2 * max_bits + 1, 4),
+            method,
+            warmups=warmups,
+            trials=trials,
+        )
+
+    return results
+
+
+def save_results(results: Sequence[BenchmarkResult], path: str) -> None:
+    """
+    Saves the results of benchmarks to a JSON or a CSV file, depending on the
+    extension of the path.
+
+    Parameters
+    ----------
+    results : Sequence[BenchmarkResult]
+        Results to save.
+    path : str
+        Path of the file, ending in ".json" or ".csv".
+
+    Raises
+    ------
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".json":
+        with open(path, "w", encoding="utf-8") as file:
+            json.dump(
+                [result._asdict() for result in results], file, indent=2
+            )
+    elif extension == ".csv":
+        with open(path, "w", encoding="utf-8", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(BENCHMARK_FIELDS)
+            writer.writerows(results)
+    else:
+        raise ValueError(f"'{path}' is not a JSON or a CSV file.")
+
+
+def load_results(path: str) -> List[BenchmarkResult]:
+    """
+    Loads the results of benchmarks saved by "save_results".
+
+    Parameters
+    ----------
+    path : str
+        Path of the file, ending in ".json" or ".csv".
+
+    Raises
+    ------
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    List[BenchmarkResult]
+        Results saved.
+
+    """
+    extension = os.path.splitext(path)[1].lower()
+
+    if extension == ".json":
+        with open(path, "r", encoding="utf-8") as file:
+            rows = json.load(file)
+    elif extension == ".csv":
+        with open(path, "r", encoding="utf-8", newline="") as file:
+            rows = list(csv.DictReader(file))
+    else:
+        raise ValueError(f"'{path}' is not a JSON or a CSV file.")
+
+    return [
+        BenchmarkResult(
+            str(row["name"]),
+            int(row["parameter"]),
+            int(row["trials"]),
+            float(row["median"]),
+            float(row["first_quartile"]),
+            float(row["third_quartile"]),
+            int(row["hashes"]),
+            float(row["hashes_per_second"]),
+        )
+        for row in rows
+    ]
+
+
+def compare_results(
+    results: Sequence[BenchmarkResult],
+    baseline: Sequence[BenchmarkResult],
+    tolerance: float = 0.1,
+) -> List[Dict[str, object]]:
+    """
+    Compares the results of benchmarks with the ones of a baseline. A
+    benchmark is a regression if its median is slower than the one of the
+    baseline by more than the tolerance and than the interquartile range of
+    the baseline, so the noise of the trials is not flagged.
+
+    Parameters
+    ----------
+    results : Sequence[BenchmarkResult]
+        Results to compare.
+    baseline : Sequence[BenchmarkResult]
+        Results of the baseline.
+    tolerance : float, optional
+        Fraction of the median of the baseline that a benchmark can be
+        slower. The default is 0.1.
+
+    Returns
+    -------
+    List[Dict[str, object]]
+        For every benchmark in both, its name, parameter, median of the
+        baseline and of the result, their ratio and if it is a regression.
+
+    """
+    baseline_results = {
+        (result.name, result.parameter): result for result in baseline
+    }
+    comparison = []
+
+    for result in results:
+        before = baseline_results.get((result.name, result.parameter))
+        if before is None:
+            continue
+
+        ratio = result.median / before.median if before.median > 0 else 1.0
+        comparison.append(
+            {
+                "name": result.name,
+                "parameter": result.parameter,
+                "baseline": before.median,
+                "median": result.median,
+                "ratio": ratio,
+                "regression": ratio > 1 + tolerance
+                and result.median - before.median
+                > before.interquartile_range,
+            }
+        )
+
+    return comparison
+
+
+def plot_results(
+    results: Sequence[BenchmarkResult], directory: str
+) -> List[str]:
+    """
+    Plots the median time and the hashes per second of every benchmark
+    against its parameter, saving a figure of every benchmark.
+
+    Parameters
+    ----------
+    results : Sequence[BenchmarkResult]
+        Results to plot.
+    directory : str
+        Directory of the figures.
+
+    Returns
+    -------
+    List[str]
+        Paths of the figures.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import matplotlib
+
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    os.makedirs(directory, exist_ok=True)
+    names = list(dict.fromkeys(result.name for result in results))
+    paths = []
+
+    for name in names:
+        benchmark = [result for result in results if result.name == name]
+        parameters = [result.parameter for result in benchmark]
+
+        figure, (time_axes, speed_axes) = plt.subplots(
+            1, 2, figsize=(12, 5)
+        )
+        time_axes.errorbar(
+            parameters,
+            [result.median for result in benchmark],
+            yerr=[
+                [
+                    result.median - result.first_quartile
+                    for result in benchmark
+                ],
+                [
+                    result.third_quartile - result.median
+                    for result in benchmark
+                ],
+            ],
+            label=name,
+        )
+        time_axes.set_xlabel("Parameter")
+        time_axes.set_ylabel("Median time (seconds)")
+        time_axes.legend()
+        speed_axes.plot(
+            parameters,
+            [result.hashes_per_second for result in benchmark],
+            label=name,
+        )
+        speed_axes.set_xlabel("Parameter")
+        speed_axes.set_ylabel("Hashes per second")
+        speed_axes.legend()
+
+        path = os.path.join(directory, f"{name}.png")
+        figure.savefig(path)
+        plt.close(figure)
+        paths.append(path)
+
+    return paths
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the benchmarks from the command line, saving and comparing them.
+
+    Parameters
+    ----------
+    argv : Optional[Sequence[str]], optional
+        Arguments of the command line. The default is None, the ones of the
+        process.
+
+    Returns
+    -------
+    int
+        Exit code, 1 if there are regressions, else 0.
+
+    """
+    parser = argparse.ArgumentParser(
+        description="Benchmarks of the hash and of the searches."
+    )
+    parser.add_argument("--max-bits", type=int, default=18)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--warmups", type=int, default=1)
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument(
+        "--output", action="append", default=[], help="JSON or CSV file."
+    )
+    parser.add_argument("--baseline", help="JSON or CSV file to compare.")
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument("--plots", help="Directory of the figures.")
+    arguments = parser.parse_args(argv)
+
+    results = run_benchmarks(
+        arguments.max_bits,
+        arguments.workers,
+        arguments.warmups,
+        arguments.trials,
+    )
+
+    for result in results:
+        print(
+            f"{result.name:<28} {result.parameter:>8} "
+            f"{result.median:>12.6f} s "
+            f"(IQR {result.interquartile_range:.6f}) "
+            f"{result.hashes_per_second:>14.1f} hashes/s"
+        )
+
+    for path in arguments.output:
+        save_results(results, path)
+
+    if arguments.plots is not None:
+        plot_results(results, arguments.plots)
+
+    if arguments.baseline is None:
+        return 0
+
+    regressions = [
+        row
+        for row in compare_results(
+            results, load_results(arguments.baseline), arguments.tolerance
+        )
+        if row["regression"]
+    ]
+
+    for row in regressions:
+        print(
+            f"Regression: {row['name']} {row['parameter']} "
+            f"{row['baseline']:.6f} s -> {row['median']:.6f} s "
+            f"(x{row['ratio']:.2f})"
+        )
+
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
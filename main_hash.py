@@ -4,13 +4,73 @@ Created on Mon Apr 29 15:24:32 2024
 
 @author: Joel Tapia Salvador
 """
-from typing import Optional, Tuple
+from __future__ import annotations
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+)
 from copy import deepcopy
-from math import sin, floor
-from itertools import product
+from math import erfc, exp, floor, pi, sin, sqrt
+from struct import Struct
+from array import array
+from collections import OrderedDict, deque
+from contextlib import ExitStack
+from bisect import bisect_right
+from functools import lru_cache
+from importlib import import_module
+from itertools import count, product, repeat
+from threading import RLock
 from time import perf_counter
-import matplotlib.pyplot as plt
-from pandas import DataFrame
+import mmap
+import os
+import sys
+
+if TYPE_CHECKING:
+    import numpy as np
+    from pandas import DataFrame
+
+
+class LazyModule:
+    """
+    Module imported the first time one of its attributes is used, so the
+    ones that take long to import are not imported by the programs and
+    processes that do not use them.
+
+    Parameters
+    ----------
+    name : str
+        Name of the module.
+
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __getattr__(self, attribute: str):
+        value = getattr(import_module(self.name), attribute)
+
+        # Next time the attribute is found without calling this.
+        setattr(self, attribute, value)
+
+        return value
+
+
+futures = LazyModule("concurrent.futures")
+
+multiprocessing = LazyModule("multiprocessing")
+
+shutil = LazyModule("shutil")
+
+tempfile = LazyModule("tempfile")
+
+if not TYPE_CHECKING:
+    np = LazyModule("numpy")
 
 SHIFT_ARRAY = [
     7,
@@ -157,7 +217,7 @@ def bit_padding(binary_string: str) -> str:
     first_padded_binary_string = binary_string + "1"
 
     second_padded_binary_string = first_padded_binary_string + "0" * (
-        448 - (len(first_padded_binary_string) % 512)
+        (448 - (len(first_padded_binary_string) % 512)) % 512
     )
 
     if (len(second_padded_binary_string)) % (512) != 448:
@@ -525,313 +585,4627 @@ def number_to_binary_string(number: int, base=32, endian: str = "big") -> str:
     return binary_string
 
 
-def uab_md5(message: str, num_bits: int) -> Optional[int]:
-    """
-    Calculates the hash of a given messages and returns the num_bits-frist bits
-    of it.
+CONSTANT_ARRAY = [constant(iteration_number) for iteration_number in range(64)]
 
-    Parameters
-    ----------
-    message : str
-        Message to apply the hash function to. It will be a string of
-        characters of arbitrary size.
-        length.
-    num_bits : int
-        Number of output bits that will be a value between 1 and 128.
+WORD_INDEX_ARRAY = (
+    list(range(16))
+    + [(5 * iteration_number + 1) % 16 for iteration_number in range(16, 32)]
+    + [(3 * iteration_number + 5) % 16 for iteration_number in range(32, 48)]
+    + [(7 * iteration_number) % 16 for iteration_number in range(48, 64)]
+)
 
-    Raises
-    ------
-    TypeError
-        Paremeters given are not the proper Type.
-    ValueError
-       Values passed onto the paramenters are not inside the exepcted values.
-    RuntimeWarning
-        If during the execution, the function (internally) get's a variable
-        with values not expected, normally due to calculations going wrong and
-        it cannot continue calculating because the result would be incorrect.
+INITIAL_BUFFERS = (0x67452301, 0xEFCDAB89, 0x98BADCFE, 0x10325476)
 
-        If this error is recived, it means a internal bug or unaccounted
-        behaviour occured, contact developer via bug report.
+BLOCK_STRUCT = Struct("<16I")
 
-    Returns
-    -------
-    Optional[int]
-        Return the hash of the message as a decimal integer or None if an error
-        occured.
+BLOCK_TEMPLATE_MAX_LENGTH = 55
 
-    """
-    # pylint: disable=too-many-locals
-    # pylint: disable=too-many-branches
-    # pylint: disable=too-many-statements
-    try:
-        if not isinstance(message, str):
-            raise TypeError("'message' is not a string.")
+BATCH_SIZE_START = 64
 
-        if not isinstance(num_bits, int):
-            raise TypeError("'num_bits' is not an integer.")
+BATCH_SIZE = 8192
 
-        if not 1 <= num_bits <= 128:
-            raise ValueError("Num bits isn't insede the scope of md5.")
+SHARD_SIZE = 1 << 18
 
-        # Convert the message to a string of binary numbers
-        message_binary = string_to_binary_string(message)
+STREAM_CHUNK_SIZE = 1 << 20
 
-        # Add the 1 at the end plus the enough number of 0 so the lenght is
-        # correct
-        message_padded = bit_padding(message_binary)
+CHECKPOINT_MAGIC = b"UABC"
 
-        # Add the 64 less significant bits (little-endian) of the lenght of the
-        # message at the end.
-        message_extended = extension(message_padded, len(message_binary))
+CHECKPOINT_STRUCT = Struct("<4sBBBxH16sQQQ")
 
-        # Initiate buffers
-        buffer_a = 0x67452301
-        buffer_b = 0xEFCDAB89
-        buffer_c = 0x98BADCFE
-        buffer_d = 0x10325476
+CHECKPOINT_SECOND_PREIMAGE = 0
 
-        # Process every 512-bit sized chunks of the message
-        for chunk_number in range(len(message_extended) // 512):
-            chunk = deepcopy(
-                message_extended[
-                    (512 * (chunk_number)) : (512 * (chunk_number + 1))
-                ]
-            )
+CHECKPOINT_COLLISION = 1
 
-            if len(chunk) != 512:
-                raise RuntimeError(
-                    f"Chunk size is not 512 bits, is {len(chunk)}"
-                )
+PREIMAGE_TABLE_MAGIC = b"UABP"
 
-            # Initiate the buffers of every iteration
-            sub_buffer_a = deepcopy(buffer_a)
-            sub_buffer_b = deepcopy(buffer_b)
-            sub_buffer_c = deepcopy(buffer_c)
-            sub_buffer_d = deepcopy(buffer_d)
+PREIMAGE_TABLE_STRUCT = Struct("<4sBxHQ")
 
-            # Main loop
-            for iteration_number in range(64):
-                if iteration_number < 16:
-                    function_value = functions(
-                        "F", sub_buffer_b, sub_buffer_c, sub_buffer_d
-                    )
+PREIMAGE_TABLE_ENTRY_STRUCT = Struct("<Q")
 
-                    word_number = deepcopy(iteration_number)
+PREIMAGE_TABLE_MAX_BITS = 32
 
-                elif iteration_number < 32:
-                    function_value = functions(
-                        "G", sub_buffer_b, sub_buffer_c, sub_buffer_d
-                    )
+PREIMAGE_TABLES = {}
 
-                    word_number = (5 * iteration_number + 1) % 16
+RAINBOW_TABLE_MAGIC = b"UABR"
 
-                elif iteration_number < 48:
-                    function_value = functions(
-                        "H", sub_buffer_b, sub_buffer_c, sub_buffer_d
-                    )
+RAINBOW_TABLE_STRUCT = Struct("<4sBBHQ")
 
-                    word_number = (3 * iteration_number + 5) % 16
+RAINBOW_TABLE_MAX_BITS = 56
 
-                else:
-                    function_value = functions(
-                        "I", sub_buffer_b, sub_buffer_c, sub_buffer_d
-                    )
+RAINBOW_TABLE_BUCKET_BITS = 8
 
-                    word_number = (7 * iteration_number) % 16
+RAINBOW_TABLE_BUCKET_CHAINS = 1 << 22
 
-                word = int(
-                    number_to_binary_string(
-                        int(
-                            chunk[32 * (word_number) : 32 * (word_number + 1)],
-                            2,
-                        ),
-                        endian="little",
-                    ),
-                    2,
-                )
+RAINBOW_TABLES = {}
 
-                if word.bit_length() > 32:
-                    raise RuntimeError(
-                        f"Word size is not 32 bits, is {word.bit_length()}."
-                    )
+DIGEST_CACHE_MAX_ENTRIES = 4096
 
-                f_value = (
-                    function_value
-                    + sub_buffer_a
-                    + constant(iteration_number)
-                    + word
-                )
+DIGEST_CACHE_MAX_BYTES = 1 << 24
 
-                sub_buffer_a = deepcopy(sub_buffer_d)
-                sub_buffer_d = deepcopy(sub_buffer_c)
-                sub_buffer_c = deepcopy(sub_buffer_b)
-                sub_buffer_b = (
-                    sub_buffer_b
-                    + circular_shift(f_value, SHIFT_ARRAY[iteration_number])
-                ) & 0xFFFFFFFF
+HASH_MODES = ("fast", "validated")
 
-                # Clean variables to assure clean state in every round.
-                del function_value
-                del word_number
-                del word
-                del f_value
+HASH_MODE = "fast"
 
-            buffer_a = (buffer_a + sub_buffer_a) & 0xFFFFFFFF
-            buffer_b = (buffer_b + sub_buffer_b) & 0xFFFFFFFF
-            buffer_c = (buffer_c + sub_buffer_c) & 0xFFFFFFFF
-            buffer_d = (buffer_d + sub_buffer_d) & 0xFFFFFFFF
 
-            # Clean variables to assure clean state in every digest iteration.
-            del chunk
-            del sub_buffer_a
-            del sub_buffer_b
-            del sub_buffer_c
-            del sub_buffer_d
-            del iteration_number
+def message_to_bytes(message: str) -> bytes:
+    """
+    Transforms a message into the bytes the hash function works with, every
+    character is a byte, the same as "string_to_binary_string" does with bits.
 
-        numerical_hash_sum = (
-            (buffer_d << 96) + (buffer_c << 64) + (buffer_b << 32) + buffer_a
-        )
+    Parameters
+    ----------
+    message : str
+        Message to transform. Every character must be representable in a byte.
 
-        if numerical_hash_sum.bit_length() > 128:
-            raise RuntimeError(
-                "Hash size is not 128 bits, is "
-                + f"{numerical_hash_sum.bit_length()}."
-            )
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
 
-        binary_string_hashed_message = number_to_binary_string(
-            numerical_hash_sum, base=128, endian="little"
-        )
+    Returns
+    -------
+    bytes
+        Bytes of the message.
 
-        return int(binary_string_hashed_message[:num_bits], 2)
-    except:  # pylint: disable=bare-except
-        return None
+    """
+    if not isinstance(message, str):
+        raise TypeError("'message' is not a string.")
+
+    try:
+        return message.encode("latin-1")
+    except UnicodeEncodeError as error:
+        raise ValueError(
+            "'message' has characters that do not fit in a byte."
+        ) from error
 
 
-def numerical_hash_to_hexadecimal_hash(numerical_hash: int) -> str:
+def bytes_padding(
+    message_bytes: bytes, length: Optional[int] = None
+) -> bytes:
     """
-    Transforsm the decimal representation of the hash into a hexadecimal string
-    representation.
+    Pads the message bytes adding a one bit, enough zeros so the length is
+    congruent to 448 module 512 and the 64 bits little-endian representation
+    of the length of the message, as "bit_padding" and "extension" do together.
 
     Parameters
     ----------
-    numerical_hash : int
-        hash as a decimal integer.
+    message_bytes : bytes
+        Bytes of the message to pad.
+    length : Optional[int], optional
+        Length in bytes of the whole message, when only the last bytes of it
+        are given. The default is None, the length of "message_bytes".
 
     Raises
     ------
     TypeError
         Paremeters given are not the proper Type.
+    RuntimeError
+        If during the execution, the function (internally) get's a variable
+        with values not expected, normally due to calculations going wrong and
+        it cannot continue calculating because the result would be incorrect.
+
+        If this error is recieved, it means a internal bug or unaccounted
+        behaviour occured, contact developer via bug report.
 
     Returns
     -------
-    string
-        Hexadeciaml string, string containing only the following values:
-            -0
-            -1
-            -2
-            -3
-            -4
-            -5
-            -6
-            -7
-            -8
-            -9
-            -A
-            -B
-            -C
-            -D
-            -E
-            -F
+    bytes
+        Padded and extended bytes, length is a multiple of 64 bytes.
 
     """
-    if not isinstance(numerical_hash, int):
-        raise TypeError("'numerical_hash' is not an integer.")
-    return f"{numerical_hash:032x}"
+    if not isinstance(message_bytes, bytes):
+        raise TypeError("'message_bytes' is not bytes.")
+
+    if length is None:
+        length = len(message_bytes)
 
+    if not isinstance(length, int):
+        raise TypeError("'length' is not an integer.")
 
-def second_preimage(message: str, num_bits: int) -> Optional[Tuple[str, int]]:
+    padded_bytes = (
+        message_bytes
+        + b"\x80"
+        + b"\x00" * ((55 - len(message_bytes)) % 64)
+        + ((8 * length) & 0xFFFFFFFFFFFFFFFF).to_bytes(8, byteorder="little")
+    )
+
+    if len(padded_bytes) % 64 != 0:
+        raise RuntimeError("Bytes padding has not been done correctly.")
+
+    return padded_bytes
+
+
+def md5_rounds(
+    buffers: Tuple[int, int, int, int], addends: List[int], steps: int = 64
+) -> Tuple[int, int, int, int]:
     """
-    Given a message, calculates a new message with the same hash. Does this
-    using brute forcing.
+    Applies the steps of the main loop to the buffers. Does not check the
+    parameters since it is the inner loop of every hash.
 
     Parameters
     ----------
-    message : str
-        Original message, which we want to find a collission in the hash.
-    num_bits : int
-        Number bits of the hash that we will try to collision with.
+    buffers : Tuple[int, int, int, int]
+        Buffers a, b, c and d before the first step.
+    addends : List[int]
+        For every step, the constant of the iteration plus the word of the
+        chunk used on it, without reducing to 32 bits.
+    steps : int, optional
+        Number of steps to apply. The default is 64.
 
     Returns
     -------
-    Optional[Tuple[str, int]]
-        Tuple including the message we found that has the same hash and the
-        number of iterations needed. If message not found or error occurred
-        returns None.
+    Tuple[int, int, int, int]
+        Buffers a, b, c and d after the last step, without adding the initial
+        buffers.
 
     """
-    to_match_hash = uab_md5(message, num_bits)
-    iterations = 0
-    obtained_hash = None
-    limit = 10
-    for i in range(1, limit + 1):
-        new_messages = (
-            "".join(x)
-            for x in product("".join(chr(i) for i in range(256)), repeat=i)
+    # pylint: disable=invalid-name
+    a, b, c, d = buffers
+
+    for iteration_number in range(min(steps, 16)):
+        f_value = (d ^ (b & (c ^ d))) + a + addends[iteration_number]
+        shift = SHIFT_ARRAY[iteration_number]
+        f_value &= 0xFFFFFFFF
+        a, d, c = d, c, b
+        b = (b + ((f_value << shift) | (f_value >> (32 - shift)))) & 0xFFFFFFFF
+
+    for iteration_number in range(16, min(steps, 32)):
+        f_value = (c ^ (d & (b ^ c))) + a + addends[iteration_number]
+        shift = SHIFT_ARRAY[iteration_number]
+        f_value &= 0xFFFFFFFF
+        a, d, c = d, c, b
+        b = (b + ((f_value << shift) | (f_value >> (32 - shift)))) & 0xFFFFFFFF
+
+    for iteration_number in range(32, min(steps, 48)):
+        f_value = (b ^ c ^ d) + a + addends[iteration_number]
+        shift = SHIFT_ARRAY[iteration_number]
+        f_value &= 0xFFFFFFFF
+        a, d, c = d, c, b
+        b = (b + ((f_value << shift) | (f_value >> (32 - shift)))) & 0xFFFFFFFF
+
+    for iteration_number in range(48, min(steps, 64)):
+        f_value = (
+            (c ^ (b | (d ^ 0xFFFFFFFF))) + a + addends[iteration_number]
         )
+        shift = SHIFT_ARRAY[iteration_number]
+        f_value &= 0xFFFFFFFF
+        a, d, c = d, c, b
+        b = (b + ((f_value << shift) | (f_value >> (32 - shift)))) & 0xFFFFFFFF
 
-        for new_message in new_messages:
-            iterations += 1
-            obtained_hash = uab_md5(new_message, num_bits)
-            if to_match_hash == obtained_hash and message != new_message:
-                return new_message, iterations
-
-    return None
+    return a, b, c, d
 
 
-def collision(num_bits: int) -> Optional[Tuple[str, str, int]]:
+def chunk_addends(words: Tuple[int, ...]) -> List[int]:
     """
-    Given a number of bits of the hash to collision, searches two distinct
-    messages with same hash. Does so using brute force.
+    Calculates, for every step, the constant of the iteration plus the word of
+    the chunk used on it. Does not check the parameters.
 
     Parameters
     ----------
-    num_bits : int
-        Number bits of the hash that we will try to collision with.
+    words : Tuple[int, ...]
+        The 16 words of the chunk.
 
     Returns
     -------
-    Optional[Tuple[str, str, int]]
-        Tuple including the messages we found that have the same hash and the
-        number of iterations needed. If messages not found or error occurred
-        returns None.
+    List[int]
+        Addends of the 64 steps, without reducing to 32 bits.
 
     """
-    hash_dict = {}
+    return [
+        constant_value + words[word_number]
+        for constant_value, word_number in zip(
+            CONSTANT_ARRAY, WORD_INDEX_ARRAY
+        )
+    ]
 
-    iterations = 1
 
-    for i in range(10):
-        messages = (
-            "".join(x)
-            for x in product("".join(chr(i) for i in range(256)), repeat=i)
-        )
+def md5_compress(
+    buffers: Tuple[int, int, int, int], words: Tuple[int, ...]
+) -> Tuple[int, int, int, int]:
+    """
+    Processes one 512-bit chunk, given as its 16 little-endian words, and adds
+    the result to the buffers. Does not check the parameters since it is the
+    inner loop of every hash.
 
-        for message in messages:
-            hash_val = uab_md5(message, num_bits)
+    Parameters
+    ----------
+    buffers : Tuple[int, int, int, int]
+        Buffers a, b, c and d before processing the chunk.
+    words : Tuple[int, ...]
+        The 16 words of the chunk.
 
-            if hash_val in hash_dict:
-                return (hash_dict[hash_val], message, iterations)
+    Returns
+    -------
+    Tuple[int, int, int, int]
+        Buffers a, b, c and d after processing the chunk.
 
-            hash_dict[hash_val] = message
-            iterations += 1
+    """
+    sub_buffers = md5_rounds(buffers, chunk_addends(words))
 
-    return None
+    return (
+        (buffers[0] + sub_buffers[0]) & 0xFFFFFFFF,
+        (buffers[1] + sub_buffers[1]) & 0xFFFFFFFF,
+        (buffers[2] + sub_buffers[2]) & 0xFFFFFFFF,
+        (buffers[3] + sub_buffers[3]) & 0xFFFFFFFF,
+    )
 
 
-def graph_times(num_bits: int) -> DataFrame:
+def buffers_to_hash(buffers: Tuple[int, int, int, int], num_bits: int) -> int:
     """
-    Graphs the time of the collison algorithms.
+    Joins the buffers into the 128-bit hash, in little-endian, and returns the
+    num_bits-first bits of it. Does not check the parameters.
+
+    Parameters
+    ----------
+    buffers : Tuple[int, int, int, int]
+        Buffers a, b, c and d after processing all the chunks.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+
+    Returns
+    -------
+    int
+        The num_bits-first bits of the hash as a decimal integer.
+
+    """
+    return int.from_bytes(
+        b"".join(buffer.to_bytes(4, byteorder="little") for buffer in buffers),
+        byteorder="big",
+    ) >> (128 - num_bits)
+
+
+def md5_truncated(
+    buffers: Tuple[int, int, int, int], words: Tuple[int, ...], num_bits: int
+) -> int:
+    """
+    Processes the last 512-bit chunk and returns the num_bits-first bits of
+    the hash, calculating only what affects them. The first 32 bits are the
+    buffer a, which does not change after the step 60, so the last 3 steps
+    are skipped, and the first 64 bits only need the buffers a and b. Does not
+    check the parameters.
+
+    Parameters
+    ----------
+    buffers : Tuple[int, int, int, int]
+        Buffers a, b, c and d before processing the last chunk.
+    words : Tuple[int, ...]
+        The 16 words of the last chunk.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+
+    Returns
+    -------
+    int
+        The num_bits-first bits of the hash as a decimal integer.
+
+    """
+    if num_bits <= 32:
+        # After the step 60 the buffer b is moved until it is the buffer a.
+        _, sub_buffer_b, _, _ = md5_rounds(buffers, chunk_addends(words), 61)
+
+        return int.from_bytes(
+            ((buffers[0] + sub_buffer_b) & 0xFFFFFFFF).to_bytes(
+                4, byteorder="little"
+            ),
+            byteorder="big",
+        ) >> (32 - num_bits)
+
+    if num_bits <= 64:
+        sub_buffer_a, sub_buffer_b, _, _ = md5_rounds(
+            buffers, chunk_addends(words)
+        )
+
+        return int.from_bytes(
+            ((buffers[0] + sub_buffer_a) & 0xFFFFFFFF).to_bytes(
+                4, byteorder="little"
+            )
+            + ((buffers[1] + sub_buffer_b) & 0xFFFFFFFF).to_bytes(
+                4, byteorder="little"
+            ),
+            byteorder="big",
+        ) >> (64 - num_bits)
+
+    return buffers_to_hash(md5_compress(buffers, words), num_bits)
+
+
+def uab_md5_bytes(message_bytes: bytes, num_bits: int) -> int:
+    """
+    Calculates the hash of the given bytes and returns the num_bits-first bits
+    of it. Does not check the parameters, it is the core used by "uab_md5" and
+    the brute force searches.
+
+    Parameters
+    ----------
+    message_bytes : bytes
+        Bytes of the message to apply the hash function to.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+
+    Returns
+    -------
+    int
+        Return the hash of the message as a decimal integer.
+
+    """
+    padded_bytes = bytes_padding(message_bytes)
+
+    buffers = INITIAL_BUFFERS
+
+    for words in BLOCK_STRUCT.iter_unpack(padded_bytes[:-64]):
+        buffers = md5_compress(buffers, words)
+
+    return md5_truncated(
+        buffers,
+        BLOCK_STRUCT.unpack_from(padded_bytes, len(padded_bytes) - 64),
+        num_bits,
+    )
+
+
+class DigestCacheInfo(NamedTuple):
+    """
+    State of the cache of the digests, see "digest_cache_info".
+
+    Attributes
+    ----------
+    enabled : bool
+        If "uab_md5" uses the cache.
+    hits : int
+        Hashes found in the cache.
+    misses : int
+        Hashes calculated and added to the cache.
+    entries : int
+        Messages in the cache.
+    nbytes : int
+        Bytes of the messages and digests in the cache.
+    max_entries : int
+        Maximum number of messages in the cache.
+    max_bytes : int
+        Maximum number of bytes of the messages and digests in the cache.
+
+    """
+
+    enabled: bool
+    hits: int
+    misses: int
+    entries: int
+    nbytes: int
+    max_entries: int
+    max_bytes: int
+
+
+class DigestCache:
+    """
+    Cache of the 128 bits digests of the last messages hashed, so the hash of
+    the same message with any number of bits is found without calculating
+    it. When it is full, the messages used the longest time ago are removed.
+    It can be used by many threads at the same time.
+
+    Parameters
+    ----------
+    max_entries : int, optional
+        Maximum number of messages. The default is DIGEST_CACHE_MAX_ENTRIES.
+    max_bytes : int, optional
+        Maximum number of bytes of the messages and digests. The default is
+        DIGEST_CACHE_MAX_BYTES.
+
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DIGEST_CACHE_MAX_ENTRIES,
+        max_bytes: int = DIGEST_CACHE_MAX_BYTES,
+    ):
+        self.enabled = False
+        self.lock = RLock()
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.digests = OrderedDict()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+
+    def digest(self, message_bytes: bytes) -> int:
+        """
+        Calculates the 128 bits digest of a message, or finds it in the cache.
+
+        Parameters
+        ----------
+        message_bytes : bytes
+            Message.
+
+        Returns
+        -------
+        int
+            Digest of the message.
+
+        """
+        with self.lock:
+            digest = self.digests.get(message_bytes)
+
+            if digest is not None:
+                self.hits += 1
+                self.digests.move_to_end(message_bytes)
+                return digest
+
+            self.misses += 1
+
+        # The hash is calculated without the lock, so other threads are not
+        # waiting for it.
+        if len(message_bytes) <= STREAM_CHUNK_SIZE:
+            digest = uab_md5_bytes(message_bytes, 128)
+        else:
+            digest = UabMd5(message_bytes).digest(128)
+
+        with self.lock:
+            if (
+                len(message_bytes) + 16 > self.max_bytes
+                or self.max_entries < 1
+                or message_bytes in self.digests
+            ):
+                return digest
+
+            self.digests[message_bytes] = digest
+            self.nbytes += len(message_bytes) + 16
+            self.shrink()
+
+        return digest
+
+    def shrink(self) -> None:
+        """
+        Removes the messages used the longest time ago until the cache is not
+        over its size.
+
+        """
+        with self.lock:
+            while self.digests and (
+                len(self.digests) > self.max_entries
+                or self.nbytes > self.max_bytes
+            ):
+                old_message, _ = self.digests.popitem(last=False)
+                self.nbytes -= len(old_message) + 16
+
+    def clear(self) -> None:
+        """
+        Removes every message of the cache and resets the counters.
+
+        """
+        with self.lock:
+            self.digests.clear()
+            self.nbytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+DIGEST_CACHE = DigestCache()
+
+
+def configure_digest_cache(
+    enabled: bool = True,
+    max_entries: Optional[int] = None,
+    max_bytes: Optional[int] = None,
+) -> None:
+    """
+    Enables or disables the cache of the digests used by "uab_md5", and
+    changes its size. Messages over the new size are removed.
+
+    Parameters
+    ----------
+    enabled : bool, optional
+        If "uab_md5" uses the cache. The default is True.
+    max_entries : Optional[int], optional
+        Maximum number of messages. The default is None, not changing it.
+    max_bytes : Optional[int], optional
+        Maximum number of bytes of the messages and digests. The default is
+        None, not changing it.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    None.
+
+    """
+    if not isinstance(enabled, bool):
+        raise TypeError("'enabled' is not a boolean.")
+
+    for name, value in (
+        ("max_entries", max_entries),
+        ("max_bytes", max_bytes),
+    ):
+        if value is not None and not isinstance(value, int):
+            raise TypeError(f"'{name}' is not an integer.")
+
+        if value is not None and value < 0:
+            raise ValueError(f"'{name}' is negative.")
+
+    with DIGEST_CACHE.lock:
+        DIGEST_CACHE.enabled = enabled
+
+        if max_entries is not None:
+            DIGEST_CACHE.max_entries = max_entries
+
+        if max_bytes is not None:
+            DIGEST_CACHE.max_bytes = max_bytes
+
+        DIGEST_CACHE.shrink()
+
+
+def digest_cache_info() -> DigestCacheInfo:
+    """
+    Gives the state of the cache of the digests used by "uab_md5".
+
+    Returns
+    -------
+    DigestCacheInfo
+        State of the cache.
+
+    """
+    with DIGEST_CACHE.lock:
+        return DigestCacheInfo(
+            DIGEST_CACHE.enabled,
+            DIGEST_CACHE.hits,
+            DIGEST_CACHE.misses,
+            len(DIGEST_CACHE.digests),
+            DIGEST_CACHE.nbytes,
+            DIGEST_CACHE.max_entries,
+            DIGEST_CACHE.max_bytes,
+        )
+
+
+def clear_digest_cache() -> None:
+    """
+    Removes every message of the cache of the digests used by "uab_md5" and
+    resets its counters.
+
+    Returns
+    -------
+    None.
+
+    """
+    DIGEST_CACHE.clear()
+
+
+def set_hash_mode(mode: str) -> None:
+    """
+    Changes how "uab_md5" calculates the hashes when no mode is given.
+    - fast: checks the parameters once and calculates the hash without any
+      other check.
+    - validated: calculates the hash with "uab_md5_reference", checking the
+      parameters and results of every step, for debugging.
+
+    Parameters
+    ----------
+    mode : str
+        Mode, one of HASH_MODES.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    None.
+
+    """
+    global HASH_MODE  # pylint: disable=global-statement
+
+    if not isinstance(mode, str):
+        raise TypeError("'mode' is not a string.")
+
+    if mode not in HASH_MODES:
+        raise ValueError("'mode' is not a valid value.")
+
+    HASH_MODE = mode
+
+
+def get_hash_mode() -> str:
+    """
+    Gives how "uab_md5" calculates the hashes when no mode is given, see
+    "set_hash_mode".
+
+    Returns
+    -------
+    str
+        Mode, one of HASH_MODES.
+
+    """
+    return HASH_MODE
+
+
+def uab_md5(
+    message: str | bytes | bytearray | memoryview,
+    num_bits: int,
+    mode: Optional[str] = None,
+) -> Optional[int]:
+    """
+    Calculates the hash of a given messages and returns the num_bits-frist bits
+    of it.
+
+    Parameters
+    ----------
+    message : str | bytes | bytearray | memoryview
+        Message to apply the hash function to. It will be a string of
+        characters of arbitrary size or the bytes of it, big bytes objects
+        are hashed by chunks without copying them. Strings and bytes use the
+        cache of the digests if it is enabled, see "configure_digest_cache".
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+    mode : Optional[str], optional
+        How the hash is calculated, "fast" or "validated", see
+        "set_hash_mode". The default is None, the one set by it.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+       Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    Optional[int]
+        Return the hash of the message as a decimal integer or None if an error
+        occured.
+
+    """
+    try:
+        if not isinstance(message, (str, bytes, bytearray, memoryview)):
+            raise TypeError("'message' is not a string or bytes.")
+
+        if not isinstance(num_bits, int):
+            raise TypeError("'num_bits' is not an integer.")
+
+        if not 1 <= num_bits <= 128:
+            raise ValueError("Num bits isn't insede the scope of md5.")
+
+        if mode is None:
+            mode = HASH_MODE
+
+        if mode not in HASH_MODES:
+            raise ValueError("'mode' is not a valid value.")
+
+        if mode == "validated":
+            if not isinstance(message, str):
+                message = bytes(message).decode("latin-1")
+
+            return uab_md5_reference(message, num_bits)
+
+        if isinstance(message, str):
+            message = message_to_bytes(message)
+
+        if DIGEST_CACHE.enabled and isinstance(message, bytes):
+            return DIGEST_CACHE.digest(message) >> (128 - num_bits)
+
+        if isinstance(message, bytes) and len(message) <= STREAM_CHUNK_SIZE:
+            return uab_md5_bytes(message, num_bits)
+
+        return UabMd5(message).digest(num_bits)
+    except:  # pylint: disable=bare-except
+        return None
+
+
+def md5_rounds_array(
+    buffers: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    words: np.ndarray,
+    steps: int = 64,
+    first_step: int = 0,
+    addends: Sequence[int] = CONSTANT_ARRAY,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Applies the steps of the main loop to many chunks at the same time, every
+    operation is done over the whole array. Does not check the parameters
+    since it is the inner loop of every batch.
+
+    Parameters
+    ----------
+    buffers : Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        Buffers a, b, c and d of every chunk before the first step, arrays of
+        uint32.
+    words : np.ndarray
+        Array of uint32 with shape (number of chunks, 16), the words of every
+        chunk. With the addends of a "block_template" only the first words,
+        the ones that change between chunks.
+    steps : int, optional
+        Number of steps to apply. The default is 64.
+    first_step : int, optional
+        Step to start from, the buffers given must be the ones after the
+        previous step. The default is 0.
+    addends : Sequence[int], optional
+        What is added to every step besides the words. The default is
+        CONSTANT_ARRAY.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        Buffers a, b, c and d of every chunk after the last step, without
+        adding the initial buffers.
+
+    """
+    # pylint: disable=invalid-name
+    a, b, c, d = buffers
+    number_words = words.shape[1]
+
+    for iteration_number in range(first_step, steps):
+        if iteration_number < 16:
+            function_value = d ^ (b & (c ^ d))
+        elif iteration_number < 32:
+            function_value = c ^ (d & (b ^ c))
+        elif iteration_number < 48:
+            function_value = b ^ c ^ d
+        else:
+            function_value = c ^ (b | ~d)
+
+        f_value = function_value + a + np.uint32(addends[iteration_number])
+
+        # Words not given are already in the addends.
+        if WORD_INDEX_ARRAY[iteration_number] < number_words:
+            f_value += words[:, WORD_INDEX_ARRAY[iteration_number]]
+
+        shift = SHIFT_ARRAY[iteration_number]
+
+        a, d, c = d, c, b
+        b = b + (
+            (f_value << np.uint32(shift)) | (f_value >> np.uint32(32 - shift))
+        )
+
+    return a, b, c, d
+
+
+def buffers_to_hash_array(
+    buffers: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    num_bits: int,
+) -> np.ndarray:
+    """
+    Joins the buffers of every hash into the 128-bit hash, in little-endian,
+    and returns the num_bits-first bits of them. Does not check the
+    parameters.
+
+    Parameters
+    ----------
+    buffers : Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        Buffers a, b, c and d of every hash, arrays of uint32. If num_bits is
+        64 or less only a and b are needed.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+
+    Returns
+    -------
+    np.ndarray
+        The num_bits-first bits of every hash, as uint64 if num_bits is 64 or
+        less, if not as Python integers.
+
+    """
+    if num_bits <= 64:
+        first_half = (
+            buffers[0].byteswap().astype(np.uint64) << np.uint64(32)
+        ) | buffers[1].byteswap().astype(np.uint64)
+
+        return first_half >> np.uint64(64 - num_bits)
+
+    return np.array(
+        [
+            buffers_to_hash(
+                (int(buffer_a), int(buffer_b), int(buffer_c), int(buffer_d)),
+                num_bits,
+            )
+            for buffer_a, buffer_b, buffer_c, buffer_d in zip(*buffers)
+        ],
+        dtype=object,
+    )
+
+
+def md5_truncated_array(
+    buffers: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    words: np.ndarray,
+    num_bits: int,
+    addends: Sequence[int] = CONSTANT_ARRAY,
+) -> np.ndarray:
+    """
+    Processes the last chunk of many messages at the same time and returns
+    the num_bits-first bits of every hash, calculating only what affects
+    them, as "md5_truncated" does. Does not check the parameters.
+
+    Parameters
+    ----------
+    buffers : Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        Buffers a, b, c and d of every message before processing the last
+        chunk, arrays of uint32.
+    words : np.ndarray
+        Array of uint32 with shape (number of messages, 16), the words of the
+        last chunk of every message, or only the first ones, see
+        "md5_rounds_array".
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+    addends : Sequence[int], optional
+        What is added to every step besides the words. The default is
+        CONSTANT_ARRAY.
+
+    Returns
+    -------
+    np.ndarray
+        The num_bits-first bits of every hash, as uint64 if num_bits is 64 or
+        less, if not as Python integers.
+
+    """
+    if num_bits <= 32:
+        # After the step 60 the buffer b is moved until it is the buffer a.
+        _, sub_buffer_b, _, _ = md5_rounds_array(
+            buffers, words, 61, addends=addends
+        )
+
+        return (buffers[0] + sub_buffer_b).byteswap().astype(
+            np.uint64
+        ) >> np.uint64(32 - num_bits)
+
+    sub_buffers = md5_rounds_array(buffers, words, addends=addends)
+
+    if num_bits <= 64:
+        return buffers_to_hash_array(
+            (buffers[0] + sub_buffers[0], buffers[1] + sub_buffers[1]),
+            num_bits,
+        )
+
+    return buffers_to_hash_array(
+        tuple(
+            buffer + sub_buffer
+            for buffer, sub_buffer in zip(buffers, sub_buffers)
+        ),
+        num_bits,
+    )
+
+
+def preimage_target(
+    to_match_hash: int, num_bits: int
+) -> List[Tuple[int, int]]:
+    """
+    Transforms the hash a second preimage has to match into what the buffers
+    a, b, c and d must be after the last chunk, so a candidate can be
+    compared to it directly in the buffers instead of building its hash.
+
+    Parameters
+    ----------
+    to_match_hash : int
+        The num_bits-first bits of the hash to match.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+
+    Returns
+    -------
+    List[Tuple[int, int]]
+        For the buffers a, b, c and d, the mask of the bits fixed by the hash
+        and their value, buffers without any bit fixed have a mask of 0.
+
+    """
+    hash_bytes = (to_match_hash << (128 - num_bits)).to_bytes(16, "big")
+    mask_bytes = (((1 << num_bits) - 1) << (128 - num_bits)).to_bytes(
+        16, "big"
+    )
+
+    return [
+        (
+            int.from_bytes(mask_bytes[4 * number : 4 * number + 4], "little"),
+            int.from_bytes(hash_bytes[4 * number : 4 * number + 4], "little"),
+        )
+        for number in range(4)
+    ]
+
+
+def md5_matches_array(
+    buffers: Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray],
+    words: np.ndarray,
+    target: List[Tuple[int, int]],
+    addends: Sequence[int] = CONSTANT_ARRAY,
+) -> np.ndarray:
+    """
+    Processes the last chunk of many messages at the same time and checks
+    which ones get the hash of the target. The buffer a is final after the
+    step 60, so it is compared there and only the messages that match
+    continue with the last steps when the target fixes more buffers. Does not
+    check the parameters.
+
+    Parameters
+    ----------
+    buffers : Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        Buffers a, b, c and d of every message before processing the last
+        chunk, arrays of uint32.
+    words : np.ndarray
+        Array of uint32 with shape (number of messages, 16), the words of the
+        last chunk of every message, or only the first ones, see
+        "md5_rounds_array".
+    target : List[Tuple[int, int]]
+        Masks and values the buffers must have, from "preimage_target".
+    addends : Sequence[int], optional
+        What is added to every step besides the words. The default is
+        CONSTANT_ARRAY.
+
+    Returns
+    -------
+    np.ndarray
+        Array of booleans, true for the messages with the hash of the target.
+
+    """
+    sub_buffers = md5_rounds_array(buffers, words, 61, addends=addends)
+
+    # After the step 60 the buffer b is moved until it is the buffer a.
+    matches = (
+        (buffers[0] + sub_buffers[1]) & np.uint32(target[0][0])
+    ) == np.uint32(target[0][1])
+
+    if target[1][0] == 0:
+        return matches
+
+    survivors = np.flatnonzero(matches)
+
+    if survivors.size == 0:
+        return matches
+
+    sub_buffers = md5_rounds_array(
+        tuple(sub_buffer[survivors] for sub_buffer in sub_buffers),
+        words[survivors],
+        64,
+        61,
+        addends,
+    )
+
+    survivors_matches = np.ones(survivors.size, dtype=bool)
+    for buffer, sub_buffer, (mask, value) in zip(
+        buffers[1:], sub_buffers[1:], target[1:]
+    ):
+        survivors_matches &= (
+            (buffer[survivors] + sub_buffer) & np.uint32(mask)
+        ) == np.uint32(value)
+
+    matches[survivors] = survivors_matches
+
+    return matches
+
+
+def pack_messages(messages: Sequence[str | bytes]) -> np.ndarray:
+    """
+    Pads the messages and packs their words in an array.
+
+    Parameters
+    ----------
+    messages : Sequence[str | bytes]
+        Messages to pack, all must have the same number of 512-bit chunks
+        once padded.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    np.ndarray
+        Array of uint32 with shape (number of messages, number of chunks, 16).
+
+    """
+    padded_messages = [
+        bytes_padding(
+            message_to_bytes(message) if isinstance(message, str) else message
+        )
+        for message in messages
+    ]
+
+    if not padded_messages:
+        return np.zeros((0, 1, 16), dtype=np.uint32)
+
+    number_chunks = len(padded_messages[0]) // 64
+
+    for padded_message in padded_messages:
+        if len(padded_message) != 64 * number_chunks:
+            raise ValueError(
+                "'messages' do not have all the same number of chunks."
+            )
+
+    return (
+        np.frombuffer(b"".join(padded_messages), dtype="<u4")
+        .reshape(len(padded_messages), number_chunks, 16)
+        .astype(np.uint32)
+    )
+
+
+def process_chunks_array(
+    words: np.ndarray,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Processes every chunk but the last of many messages at the same time.
+    Does not check the parameters.
+
+    Parameters
+    ----------
+    words : np.ndarray
+        Array of uint32 with shape (number of messages, number of chunks, 16),
+        as given by "pack_messages".
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        Buffers a, b, c and d of every message before the last chunk.
+
+    """
+    buffers = initial_buffers_array(words.shape[0])
+
+    for chunk_number in range(words.shape[1] - 1):
+        sub_buffers = md5_rounds_array(buffers, words[:, chunk_number, :])
+        buffers = tuple(
+            buffer + sub_buffer
+            for buffer, sub_buffer in zip(buffers, sub_buffers)
+        )
+
+    return buffers
+
+
+def uab_md5_batch_matches(
+    messages: Sequence[str | bytes], num_bits: int, to_match_hash: int
+) -> np.ndarray:
+    """
+    Checks which of the messages have the given hash, calculating them at the
+    same time as "uab_md5_batch" but comparing in the buffers and stopping
+    most messages at the step 60, see "md5_matches_array".
+
+    Parameters
+    ----------
+    messages : Sequence[str | bytes]
+        Messages to check, all must have the same number of 512-bit chunks
+        once padded.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+    to_match_hash : int
+        The num_bits-first bits of the hash to match.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    np.ndarray
+        Array of booleans, true for the messages with the hash.
+
+    """
+    if not isinstance(num_bits, int):
+        raise TypeError("'num_bits' is not an integer.")
+
+    if not isinstance(to_match_hash, int):
+        raise TypeError("'to_match_hash' is not an integer.")
+
+    if not 1 <= num_bits <= 128:
+        raise ValueError("Num bits isn't insede the scope of md5.")
+
+    if not 0 <= to_match_hash < 1 << num_bits:
+        raise ValueError("'to_match_hash' has more bits than 'num_bits'.")
+
+    words = pack_messages(messages)
+
+    return md5_matches_array(
+        process_chunks_array(words),
+        words[:, -1, :],
+        preimage_target(to_match_hash, num_bits),
+    )
+
+
+def records_array(records, stride: int) -> np.ndarray:
+    """
+    Reads messages of the same length stored one after the other in a buffer
+    as an array with a message every row, without copying them.
+
+    Parameters
+    ----------
+    records : buffer
+        Object with the buffer protocol, like bytes, bytearray, memoryview,
+        mmap or a contiguous NumPy array, with the records one after the
+        other. A 2-dimensional NumPy array of uint8 has a record every row.
+    stride : int
+        Length in bytes of every record.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    np.ndarray
+        Array of uint8 with shape (number of records, stride).
+
+    """
+    if not isinstance(stride, int):
+        raise TypeError("'stride' is not an integer.")
+
+    if stride < 0:
+        raise ValueError("'stride' is not a valid length.")
+
+    if isinstance(records, np.ndarray) and records.ndim == 2:
+        if records.dtype != np.uint8:
+            raise TypeError("'records' rows are not of uint8.")
+
+        if records.shape[1] != stride:
+            raise ValueError("'stride' is not the length of the rows.")
+
+        return records
+
+    records = np.frombuffer(records, dtype=np.uint8)
+
+    if stride == 0 or len(records) % stride != 0:
+        raise ValueError("'records' length is not a multiple of 'stride'.")
+
+    return records.reshape(len(records) // stride, stride)
+
+
+def pack_records(records, stride: int) -> np.ndarray:
+    """
+    Pads messages of the same length stored one after the other in a buffer
+    and packs their words in an array. The records are read from the buffer
+    with array operations, no object is created for every message.
+
+    Parameters
+    ----------
+    records : buffer
+        Object with the buffer protocol, like bytes, bytearray, memoryview,
+        mmap or a contiguous NumPy array, with the records one after the
+        other. A 2-dimensional NumPy array of uint8 has a record every row.
+    stride : int
+        Length in bytes of every record.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    np.ndarray
+        Array of uint32 with shape (number of records, number of chunks, 16).
+
+    """
+    records = records_array(records, stride)
+    number_records = records.shape[0]
+
+    padded_length = 64 * ((stride + 8) // 64 + 1)
+
+    blocks = np.zeros((number_records, padded_length), dtype=np.uint8)
+    blocks[:, :stride] = records
+    blocks[:, stride] = 0x80
+    blocks[:, -8:] = np.frombuffer(
+        ((8 * stride) & 0xFFFFFFFFFFFFFFFF).to_bytes(8, byteorder="little"),
+        dtype=np.uint8,
+    )
+
+    return (
+        blocks.view("<u4")
+        .reshape(number_records, padded_length // 64, 16)
+        .astype(np.uint32, copy=False)
+    )
+
+
+@lru_cache(maxsize=None)
+def block_template(length: int) -> Tuple[int, ...]:
+    """
+    Calculates what is added to every step of the only chunk of the messages
+    of the given length besides their bytes. All of them have the same
+    padding and length words, so every step adds its constant plus its word
+    of the padded message with zeros instead of the bytes, and only the
+    first words, see "template_words", are added per message. Does not check
+    the parameters.
+
+    Parameters
+    ----------
+    length : int
+        Length in bytes of the messages, at most BLOCK_TEMPLATE_MAX_LENGTH.
+
+    Returns
+    -------
+    Tuple[int, ...]
+        What is added to every step.
+
+    """
+    words = BLOCK_STRUCT.unpack(bytes_padding(bytes(length)))
+
+    return tuple(
+        (CONSTANT_ARRAY[iteration_number] + words[word_index]) & 0xFFFFFFFF
+        for iteration_number, word_index in enumerate(WORD_INDEX_ARRAY)
+    )
+
+
+def template_words(records: np.ndarray) -> np.ndarray:
+    """
+    Packs the words of many messages of the same length that have some of
+    their bytes, the rest of the words are in their "block_template". Does
+    not check the parameters.
+
+    Parameters
+    ----------
+    records : np.ndarray
+        Array of uint8 with a message every row.
+
+    Returns
+    -------
+    np.ndarray
+        Array of uint32 with shape (number of messages, number of words with
+        bytes of the messages).
+
+    """
+    number_records, length = records.shape
+
+    if length % 4 != 0:
+        padded_records = np.zeros(
+            (number_records, length + 4 - length % 4), dtype=np.uint8
+        )
+        padded_records[:, :length] = records
+        records = padded_records
+
+    return (
+        np.ascontiguousarray(records).view("<u4").astype(np.uint32, copy=False)
+    )
+
+
+def initial_buffers_array(
+    number: int,
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Creates the initial buffers of many messages.
+
+    Parameters
+    ----------
+    number : int
+        Number of messages.
+
+    Returns
+    -------
+    Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+        Buffers a, b, c and d of every message, arrays of uint32.
+
+    """
+    return tuple(
+        np.full(number, buffer, dtype=np.uint32) for buffer in INITIAL_BUFFERS
+    )
+
+
+def uab_md5_packed(records, stride: int, num_bits: int) -> np.ndarray:
+    """
+    Calculates the hash of many messages of the same length stored one after
+    the other in a buffer and returns the num_bits-first bits of every one of
+    them, as "uab_md5_batch" does with a list of messages.
+
+    Parameters
+    ----------
+    records : buffer
+        Object with the buffer protocol with the messages one after the
+        other, or a 2-dimensional NumPy array of uint8 with a message every
+        row.
+    stride : int
+        Length in bytes of every message.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    np.ndarray
+        The hashes in the same order as the messages, as uint64 if num_bits is
+        64 or less, if not as Python integers.
+
+    """
+    if not isinstance(num_bits, int):
+        raise TypeError("'num_bits' is not an integer.")
+
+    if not 1 <= num_bits <= 128:
+        raise ValueError("Num bits isn't insede the scope of md5.")
+
+    records = records_array(records, stride)
+
+    if 0 < stride <= BLOCK_TEMPLATE_MAX_LENGTH:
+        return md5_truncated_array(
+            initial_buffers_array(records.shape[0]),
+            template_words(records),
+            num_bits,
+            block_template(stride),
+        )
+
+    words = pack_records(records, stride)
+
+    return md5_truncated_array(
+        process_chunks_array(words), words[:, -1, :], num_bits
+    )
+
+
+def uab_md5_packed_matches(
+    records, stride: int, num_bits: int, to_match_hash: int
+) -> np.ndarray:
+    """
+    Checks which of the messages of the same length stored one after the
+    other in a buffer have the given hash, as "uab_md5_batch_matches" does
+    with a list of messages.
+
+    Parameters
+    ----------
+    records : buffer
+        Object with the buffer protocol with the messages one after the
+        other, or a 2-dimensional NumPy array of uint8 with a message every
+        row.
+    stride : int
+        Length in bytes of every message.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+    to_match_hash : int
+        The num_bits-first bits of the hash to match.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    np.ndarray
+        Array of booleans, true for the messages with the hash.
+
+    """
+    if not isinstance(num_bits, int):
+        raise TypeError("'num_bits' is not an integer.")
+
+    if not isinstance(to_match_hash, int):
+        raise TypeError("'to_match_hash' is not an integer.")
+
+    if not 1 <= num_bits <= 128:
+        raise ValueError("Num bits isn't insede the scope of md5.")
+
+    if not 0 <= to_match_hash < 1 << num_bits:
+        raise ValueError("'to_match_hash' has more bits than 'num_bits'.")
+
+    records = records_array(records, stride)
+
+    if 0 < stride <= BLOCK_TEMPLATE_MAX_LENGTH:
+        return md5_matches_array(
+            initial_buffers_array(records.shape[0]),
+            template_words(records),
+            preimage_target(to_match_hash, num_bits),
+            block_template(stride),
+        )
+
+    words = pack_records(records, stride)
+
+    return md5_matches_array(
+        process_chunks_array(words),
+        words[:, -1, :],
+        preimage_target(to_match_hash, num_bits),
+    )
+
+
+def uab_md5_batch(
+    messages: Sequence[str | bytes], num_bits: int
+) -> np.ndarray:
+    """
+    Calculates the hash of many messages at the same time and returns the
+    num_bits-first bits of every one of them. All the messages must have the
+    same number of 512-bit chunks once padded, since every chunk is processed
+    for all the messages at once.
+
+    Parameters
+    ----------
+    messages : Sequence[str | bytes]
+        Messages to apply the hash function to.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    np.ndarray
+        The hashes in the same order as the messages, as uint64 if num_bits is
+        64 or less, if not as Python integers.
+
+    """
+    if not isinstance(num_bits, int):
+        raise TypeError("'num_bits' is not an integer.")
+
+    if not 1 <= num_bits <= 128:
+        raise ValueError("Num bits isn't insede the scope of md5.")
+
+    words = pack_messages(messages)
+
+    return md5_truncated_array(
+        process_chunks_array(words), words[:, -1, :], num_bits
+    )
+
+
+class UabMd5:
+    """
+    Incremental hash, messages can be given in parts with "update" and the
+    state after a common prefix can be copied and reused for every suffix,
+    so only the suffix is hashed again.
+
+    Parameters
+    ----------
+    message : str | bytes | bytearray | memoryview, optional
+        First part of the message to hash. The default is b"".
+
+    """
+
+    def __init__(self, message: str | bytes | bytearray | memoryview = b""):
+        self.buffers = INITIAL_BUFFERS
+        self.length = 0
+        self.pending = b""
+
+        if message:
+            self.update(message)
+
+    def update(self, message: str | bytes | bytearray | memoryview) -> None:
+        """
+        Adds the given part at the end of the message, processing every
+        complete 512-bit chunk. The chunks are read directly from the given
+        object, only the bytes after the last complete chunk are copied.
+
+        Parameters
+        ----------
+        message : str | bytes | bytearray | memoryview
+            Part of the message to add.
+
+        Raises
+        ------
+        TypeError
+            Paremeters given are not the proper Type.
+        ValueError
+            Values passed onto the paramenters are not inside the exepcted
+            values.
+
+        Returns
+        -------
+        None.
+
+        """
+        if isinstance(message, str):
+            message = message_to_bytes(message)
+
+        if not isinstance(message, (bytes, bytearray, memoryview)):
+            raise TypeError("'message' is not a string or bytes.")
+
+        # Only contiguous views can be read as bytes without copying them.
+        if isinstance(message, memoryview) and not message.c_contiguous:
+            message = message.tobytes()
+
+        with memoryview(message) as original_view, original_view.cast(
+            "B"
+        ) as view:
+            self.length += len(view)
+            buffers = self.buffers
+            offset = 0
+
+            if self.pending:
+                offset = min(64 - len(self.pending), len(view))
+                self.pending += bytes(view[:offset])
+
+                if len(self.pending) < 64:
+                    return
+
+                buffers = md5_compress(
+                    buffers, BLOCK_STRUCT.unpack(self.pending)
+                )
+
+            end = offset + (len(view) - offset) // 64 * 64
+
+            for chunk_offset in range(offset, end, 64):
+                buffers = md5_compress(
+                    buffers, BLOCK_STRUCT.unpack_from(view, chunk_offset)
+                )
+
+            self.buffers = buffers
+            self.pending = bytes(view[end:])
+
+    def copy(self) -> "UabMd5":
+        """
+        Copies the hash, the copy can be updated without changing this one.
+
+        Returns
+        -------
+        UabMd5
+            Copy of the hash.
+
+        """
+        new_hash = UabMd5.__new__(UabMd5)
+        new_hash.buffers = self.buffers
+        new_hash.length = self.length
+        new_hash.pending = self.pending
+
+        return new_hash
+
+    def digest(self, num_bits: int = 128) -> int:
+        """
+        Calculates the hash of the message given until now and returns the
+        num_bits-first bits of it. The hash can still be updated after.
+
+        Parameters
+        ----------
+        num_bits : int, optional
+            Number of output bits that will be a value between 1 and 128. The
+            default is 128.
+
+        Raises
+        ------
+        TypeError
+            Paremeters given are not the proper Type.
+        ValueError
+            Values passed onto the paramenters are not inside the exepcted
+            values.
+
+        Returns
+        -------
+        int
+            The num_bits-first bits of the hash as a decimal integer.
+
+        """
+        if not isinstance(num_bits, int):
+            raise TypeError("'num_bits' is not an integer.")
+
+        if not 1 <= num_bits <= 128:
+            raise ValueError("Num bits isn't insede the scope of md5.")
+
+        buffers = self.buffers
+        padded_bytes = bytes_padding(self.pending, self.length)
+
+        for words in BLOCK_STRUCT.iter_unpack(padded_bytes[:-64]):
+            buffers = md5_compress(buffers, words)
+
+        return md5_truncated(
+            buffers,
+            BLOCK_STRUCT.unpack_from(padded_bytes, len(padded_bytes) - 64),
+            num_bits,
+        )
+
+    def get_state(self) -> Tuple[Tuple[int, int, int, int], int, bytes]:
+        """
+        Exports the state of the hash.
+
+        Returns
+        -------
+        Tuple[Tuple[int, int, int, int], int, bytes]
+            Buffers a, b, c and d after the last complete chunk, length in
+            bytes of the message given until now and the bytes given after the
+            last complete chunk.
+
+        """
+        return self.buffers, self.length, self.pending
+
+    def set_state(
+        self,
+        buffers: Tuple[int, int, int, int],
+        length: int,
+        pending: bytes = b"",
+    ) -> None:
+        """
+        Imports a state of the hash, as exported by "get_state".
+
+        Parameters
+        ----------
+        buffers : Tuple[int, int, int, int]
+            Buffers a, b, c and d after the last complete chunk.
+        length : int
+            Length in bytes of the message given until now.
+        pending : bytes, optional
+            Bytes given after the last complete chunk. The default is b"".
+
+        Raises
+        ------
+        TypeError
+            Paremeters given are not the proper Type.
+        ValueError
+            Values passed onto the paramenters are not inside the exepcted
+            values.
+
+        Returns
+        -------
+        None.
+
+        """
+        if not isinstance(buffers, tuple) or len(buffers) != 4:
+            raise TypeError("'buffers' is not a tuple of four integers.")
+
+        for buffer in buffers:
+            if not isinstance(buffer, int):
+                raise TypeError("'buffers' is not a tuple of four integers.")
+
+            if not 0 <= buffer <= 0xFFFFFFFF:
+                raise ValueError("'buffers' has a buffer bigger than 32 bits.")
+
+        if not isinstance(length, int):
+            raise TypeError("'length' is not an integer.")
+
+        if not isinstance(pending, bytes):
+            raise TypeError("'pending' is not bytes.")
+
+        if length < 0 or length % 64 != len(pending):
+            raise ValueError("'length' does not match the 'pending' bytes.")
+
+        self.buffers = buffers
+        self.length = length
+        self.pending = pending
+
+
+def uab_md5_stream(
+    file, num_bits: int, chunk_size: int = STREAM_CHUNK_SIZE
+) -> int:
+    """
+    Calculates the hash of everything read from a binary file object and
+    returns the num_bits-first bits of it. The file is read in parts into the
+    same buffer, so the memory used does not depend on the size of the file.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        Binary file object, opened for reading, to hash until its end.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+    chunk_size : int, optional
+        Bytes read every time. The default is STREAM_CHUNK_SIZE.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    int
+        The num_bits-first bits of the hash as a decimal integer.
+
+    """
+    if not isinstance(num_bits, int):
+        raise TypeError("'num_bits' is not an integer.")
+
+    if not 1 <= num_bits <= 128:
+        raise ValueError("Num bits isn't insede the scope of md5.")
+
+    if not isinstance(chunk_size, int):
+        raise TypeError("'chunk_size' is not an integer.")
+
+    if chunk_size < 1:
+        raise ValueError("'chunk_size' is not a valid size.")
+
+    new_hash = UabMd5()
+    buffer = bytearray(chunk_size)
+    view = memoryview(buffer)
+
+    if hasattr(file, "readinto"):
+        size = file.readinto(buffer)
+        while size:
+            new_hash.update(view[:size])
+            size = file.readinto(buffer)
+    else:
+        data = file.read(chunk_size)
+        while data:
+            new_hash.update(data)
+            data = file.read(chunk_size)
+
+    return new_hash.digest(num_bits)
+
+
+def uab_md5_file(path: str, num_bits: int) -> int:
+    """
+    Calculates the hash of the content of a file and returns the
+    num_bits-first bits of it. The file is mapped in memory and its chunks are
+    read directly from the map, so the memory used does not depend on the
+    size of the file. Files that cannot be mapped, such as pipes or the ones
+    that report no size, are read with "uab_md5_stream".
+
+    Parameters
+    ----------
+    path : str
+        Path of the file.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+    OSError
+        The file cannot be read.
+
+    Returns
+    -------
+    int
+        The num_bits-first bits of the hash as a decimal integer.
+
+    """
+    if not isinstance(num_bits, int):
+        raise TypeError("'num_bits' is not an integer.")
+
+    if not 1 <= num_bits <= 128:
+        raise ValueError("Num bits isn't insede the scope of md5.")
+
+    with open(path, "rb") as file:
+        memory = None
+        if os.fstat(file.fileno()).st_size > 0:
+            try:
+                memory = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                pass
+
+        # Pipes and files of the system report no size but have content.
+        if memory is None:
+            return uab_md5_stream(file, num_bits)
+
+        with memory:
+            new_hash = UabMd5()
+            view = memoryview(memory)
+
+            try:
+                new_hash.update(view)
+            finally:
+                view.release()
+
+            return new_hash.digest(num_bits)
+
+
+def uab_md5_reference(message: str, num_bits: int) -> Optional[int]:
+    """
+    Calculates the hash of a given messages and returns the num_bits-frist bits
+    of it. Works with binary strings and checks every step, it is slow, use
+    "uab_md5" instead, this one is kept to verify it.
+
+    Parameters
+    ----------
+    message : str
+        Message to apply the hash function to. It will be a string of
+        characters of arbitrary size.
+        length.
+    num_bits : int
+        Number of output bits that will be a value between 1 and 128.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+       Values passed onto the paramenters are not inside the exepcted values.
+    RuntimeWarning
+        If during the execution, the function (internally) get's a variable
+        with values not expected, normally due to calculations going wrong and
+        it cannot continue calculating because the result would be incorrect.
+
+        If this error is recived, it means a internal bug or unaccounted
+        behaviour occured, contact developer via bug report.
+
+    Returns
+    -------
+    Optional[int]
+        Return the hash of the message as a decimal integer or None if an error
+        occured.
+
+    """
+    # pylint: disable=too-many-locals
+    # pylint: disable=too-many-branches
+    # pylint: disable=too-many-statements
+    try:
+        if not isinstance(message, str):
+            raise TypeError("'message' is not a string.")
+
+        if not isinstance(num_bits, int):
+            raise TypeError("'num_bits' is not an integer.")
+
+        if not 1 <= num_bits <= 128:
+            raise ValueError("Num bits isn't insede the scope of md5.")
+
+        # Convert the message to a string of binary numbers
+        message_binary = string_to_binary_string(message)
+
+        # Add the 1 at the end plus the enough number of 0 so the lenght is
+        # correct
+        message_padded = bit_padding(message_binary)
+
+        # Add the 64 less significant bits (little-endian) of the lenght of the
+        # message at the end.
+        message_extended = extension(message_padded, len(message_binary))
+
+        # Initiate buffers
+        buffer_a = 0x67452301
+        buffer_b = 0xEFCDAB89
+        buffer_c = 0x98BADCFE
+        buffer_d = 0x10325476
+
+        # Process every 512-bit sized chunks of the message
+        for chunk_number in range(len(message_extended) // 512):
+            chunk = deepcopy(
+                message_extended[
+                    (512 * (chunk_number)) : (512 * (chunk_number + 1))
+                ]
+            )
+
+            if len(chunk) != 512:
+                raise RuntimeError(
+                    f"Chunk size is not 512 bits, is {len(chunk)}"
+                )
+
+            # Initiate the buffers of every iteration
+            sub_buffer_a = deepcopy(buffer_a)
+            sub_buffer_b = deepcopy(buffer_b)
+            sub_buffer_c = deepcopy(buffer_c)
+            sub_buffer_d = deepcopy(buffer_d)
+
+            # Main loop
+            for iteration_number in range(64):
+                if iteration_number < 16:
+                    function_value = functions(
+                        "F", sub_buffer_b, sub_buffer_c, sub_buffer_d
+                    )
+
+                    word_number = deepcopy(iteration_number)
+
+                elif iteration_number < 32:
+                    function_value = functions(
+                        "G", sub_buffer_b, sub_buffer_c, sub_buffer_d
+                    )
+
+                    word_number = (5 * iteration_number + 1) % 16
+
+                elif iteration_number < 48:
+                    function_value = functions(
+                        "H", sub_buffer_b, sub_buffer_c, sub_buffer_d
+                    )
+
+                    word_number = (3 * iteration_number + 5) % 16
+
+                else:
+                    function_value = functions(
+                        "I", sub_buffer_b, sub_buffer_c, sub_buffer_d
+                    )
+
+                    word_number = (7 * iteration_number) % 16
+
+                word = int(
+                    number_to_binary_string(
+                        int(
+                            chunk[32 * (word_number) : 32 * (word_number + 1)],
+                            2,
+                        ),
+                        endian="little",
+                    ),
+                    2,
+                )
+
+                if word.bit_length() > 32:
+                    raise RuntimeError(
+                        f"Word size is not 32 bits, is {word.bit_length()}."
+                    )
+
+                f_value = (
+                    function_value
+                    + sub_buffer_a
+                    + constant(iteration_number)
+                    + word
+                )
+
+                sub_buffer_a = deepcopy(sub_buffer_d)
+                sub_buffer_d = deepcopy(sub_buffer_c)
+                sub_buffer_c = deepcopy(sub_buffer_b)
+                sub_buffer_b = (
+                    sub_buffer_b
+                    + circular_shift(f_value, SHIFT_ARRAY[iteration_number])
+                ) & 0xFFFFFFFF
+
+                # Clean variables to assure clean state in every round.
+                del function_value
+                del word_number
+                del word
+                del f_value
+
+            buffer_a = (buffer_a + sub_buffer_a) & 0xFFFFFFFF
+            buffer_b = (buffer_b + sub_buffer_b) & 0xFFFFFFFF
+            buffer_c = (buffer_c + sub_buffer_c) & 0xFFFFFFFF
+            buffer_d = (buffer_d + sub_buffer_d) & 0xFFFFFFFF
+
+            # Clean variables to assure clean state in every digest iteration.
+            del chunk
+            del sub_buffer_a
+            del sub_buffer_b
+            del sub_buffer_c
+            del sub_buffer_d
+            del iteration_number
+
+        numerical_hash_sum = (
+            (buffer_d << 96) + (buffer_c << 64) + (buffer_b << 32) + buffer_a
+        )
+
+        if numerical_hash_sum.bit_length() > 128:
+            raise RuntimeError(
+                "Hash size is not 128 bits, is "
+                + f"{numerical_hash_sum.bit_length()}."
+            )
+
+        binary_string_hashed_message = number_to_binary_string(
+            numerical_hash_sum, base=128, endian="little"
+        )
+
+        return int(binary_string_hashed_message[:num_bits], 2)
+    except:  # pylint: disable=bare-except
+        return None
+
+
+def numerical_hash_to_hexadecimal_hash(numerical_hash: int) -> str:
+    """
+    Transforsm the decimal representation of the hash into a hexadecimal string
+    representation.
+
+    Parameters
+    ----------
+    numerical_hash : int
+        hash as a decimal integer.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+
+    Returns
+    -------
+    string
+        Hexadeciaml string, string containing only the following values:
+            -0
+            -1
+            -2
+            -3
+            -4
+            -5
+            -6
+            -7
+            -8
+            -9
+            -A
+            -B
+            -C
+            -D
+            -E
+            -F
+
+    """
+    if not isinstance(numerical_hash, int):
+        raise TypeError("'numerical_hash' is not an integer.")
+    return f"{numerical_hash:032x}"
+
+
+@lru_cache(maxsize=None)
+def candidate_tails(alphabet: bytes, tail_length: int) -> Tuple[bytes, ...]:
+    """
+    Calculates, in order, every message of the given length made of the
+    characters of the alphabet, they are the ends of the candidates of the
+    brute force searches.
+
+    Parameters
+    ----------
+    alphabet : bytes
+        Characters of the candidates, in order.
+    tail_length : int
+        Length of the messages.
+
+    Returns
+    -------
+    Tuple[bytes, ...]
+        Every message of the given length.
+
+    """
+    return tuple(bytes(tail) for tail in product(alphabet, repeat=tail_length))
+
+
+class CandidateSpace:
+    """
+    Candidates of the brute force searches, every message made of the
+    characters of the alphabet with length between the minimum and maximum,
+    shorter first and in alphabetical order between the same length. Every
+    candidate has a position, an index, and they can be calculated one from
+    the other, so a search can start, be split or continue from any index.
+
+    Parameters
+    ----------
+    min_length : int, optional
+        Length of the shortest candidates. The default is 0.
+    max_length : int, optional
+        Length of the longest candidates. The default is 9.
+    alphabet : bytes, optional
+        Characters of the candidates, in order, cannot be repeated. The
+        default is every byte.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    """
+
+    def __init__(
+        self,
+        min_length: int = 0,
+        max_length: int = 9,
+        alphabet: bytes = bytes(range(256)),
+    ):
+        if not isinstance(min_length, int):
+            raise TypeError("'min_length' is not an integer.")
+
+        if not isinstance(max_length, int):
+            raise TypeError("'max_length' is not an integer.")
+
+        if not isinstance(alphabet, bytes):
+            raise TypeError("'alphabet' is not bytes.")
+
+        if not 0 <= min_length <= max_length:
+            raise ValueError("'min_length' and 'max_length' are not valid.")
+
+        if not alphabet or len(set(alphabet)) != len(alphabet):
+            raise ValueError("'alphabet' is empty or has repeated characters.")
+
+        self.min_length = min_length
+        self.max_length = max_length
+        self.alphabet = alphabet
+        self.digits = {
+            character: digit for digit, character in enumerate(alphabet)
+        }
+        self.tail_length = 1
+        while len(alphabet) ** (self.tail_length + 1) <= 1 << 16:
+            self.tail_length += 1
+
+        self.offsets = [0]
+        for length in range(min_length, max_length + 1):
+            self.offsets.append(self.offsets[-1] + len(alphabet) ** length)
+
+    @property
+    def number_candidates(self) -> int:
+        """
+        Number of candidates, it can be bigger than what "len" allows.
+
+        Returns
+        -------
+        int
+            Number of candidates.
+
+        """
+        return self.offsets[-1]
+
+    def __repr__(self) -> str:
+        return (
+            f"CandidateSpace(min_length={self.min_length}, "
+            + f"max_length={self.max_length}, alphabet={self.alphabet!r})"
+        )
+
+    def __reduce__(self):
+        return (
+            CandidateSpace,
+            (self.min_length, self.max_length, self.alphabet),
+        )
+
+    def locate(self, index: int) -> Tuple[int, int]:
+        """
+        Calculates the length of the candidate with the given index and its
+        position between the candidates of that length.
+
+        Parameters
+        ----------
+        index : int
+            Index of the candidate.
+
+        Raises
+        ------
+        TypeError
+            Paremeters given are not the proper Type.
+        IndexError
+            Index is not the one of a candidate.
+
+        Returns
+        -------
+        Tuple[int, int]
+            Length and position of the candidate.
+
+        """
+        if not isinstance(index, int):
+            raise TypeError("'index' is not an integer.")
+
+        if not 0 <= index < self.number_candidates:
+            raise IndexError("'index' is out of the candidates.")
+
+        length_number = bisect_right(self.offsets, index) - 1
+
+        return (
+            self.min_length + length_number,
+            index - self.offsets[length_number],
+        )
+
+    def position_to_bytes(self, position: int, length: int) -> bytes:
+        """
+        Calculates the message of the given length in the given position
+        between the messages of that length.
+
+        Parameters
+        ----------
+        position : int
+            Position of the message.
+        length : int
+            Length of the message.
+
+        Returns
+        -------
+        bytes
+            Message in the position.
+
+        """
+        base = len(self.alphabet)
+
+        if base == 256:
+            return position.to_bytes(length, byteorder="big").translate(
+                self.alphabet
+            )
+
+        digits = bytearray(length)
+        for digit_number in range(length - 1, -1, -1):
+            position, digit = divmod(position, base)
+            digits[digit_number] = self.alphabet[digit]
+
+        return bytes(digits)
+
+    def candidate(self, index: int) -> bytes:
+        """
+        Calculates the candidate with the given index.
+
+        Parameters
+        ----------
+        index : int
+            Index of the candidate.
+
+        Raises
+        ------
+        TypeError
+            Paremeters given are not the proper Type.
+        IndexError
+            Index is not the one of a candidate.
+
+        Returns
+        -------
+        bytes
+            Bytes of the candidate.
+
+        """
+        length, position = self.locate(index)
+
+        return self.position_to_bytes(position, length)
+
+    def index(self, message: str | bytes) -> int:
+        """
+        Calculates the index of the given candidate.
+
+        Parameters
+        ----------
+        message : str | bytes
+            Candidate.
+
+        Raises
+        ------
+        TypeError
+            Paremeters given are not the proper Type.
+        ValueError
+            Message is not a candidate.
+
+        Returns
+        -------
+        int
+            Index of the candidate.
+
+        """
+        if isinstance(message, str):
+            message = message_to_bytes(message)
+
+        if not isinstance(message, bytes):
+            raise TypeError("'message' is not a string or bytes.")
+
+        if not self.min_length <= len(message) <= self.max_length:
+            raise ValueError("'message' length is not one of the candidates.")
+
+        position = 0
+        for character in message:
+            if character not in self.digits:
+                raise ValueError("'message' is not made of the alphabet.")
+
+            position = position * len(self.alphabet) + self.digits[character]
+
+        return self.offsets[len(message) - self.min_length] + position
+
+    def batch(self, start: int, number: int) -> List[bytes]:
+        """
+        Calculates the candidates with consecutive indexes, from the given
+        one, joining the precalculated ends of the candidates to their start
+        instead of calculating every one.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first candidate.
+        number : int
+            Number of candidates, less are returned if the last candidate is
+            reached.
+
+        Raises
+        ------
+        TypeError
+            Paremeters given are not the proper Type.
+        IndexError
+            Index is not the one of a candidate.
+
+        Returns
+        -------
+        List[bytes]
+            Bytes of the candidates.
+
+        """
+        if not isinstance(number, int):
+            raise TypeError("'number' is not an integer.")
+
+        stop = max(start, min(start + number, self.number_candidates))
+        candidates = []
+
+        while start < stop:
+            length, position = self.locate(start)
+            length_stop = min(
+                stop - start + position, len(self.alphabet) ** length
+            )
+            tail_length = min(length, self.tail_length)
+            tails = candidate_tails(self.alphabet, tail_length)
+
+            while position < length_stop:
+                high, low = divmod(position, len(tails))
+                prefix = self.position_to_bytes(high, length - tail_length)
+                high_stop = min(len(tails), low + length_stop - position)
+
+                candidates.extend(
+                    [prefix + tail for tail in tails[low:high_stop]]
+                )
+
+                start += high_stop - low
+                position += high_stop - low
+
+        return candidates
+
+    def packed_batch(self, start: int, number: int) -> np.ndarray:
+        """
+        Calculates the candidates with consecutive indexes, from the given
+        one, as rows of an array, with array operations instead of creating
+        every candidate. Only candidates of the same length as the first one
+        are given.
+
+        Parameters
+        ----------
+        start : int
+            Index of the first candidate.
+        number : int
+            Number of candidates, less are returned if the last candidate of
+            the length is reached.
+
+        Raises
+        ------
+        TypeError
+            Paremeters given are not the proper Type.
+        IndexError
+            Index is not the one of a candidate.
+
+        Returns
+        -------
+        np.ndarray
+            Array of uint8 with shape (number of candidates, length).
+
+        """
+        if not isinstance(number, int):
+            raise TypeError("'number' is not an integer.")
+
+        length, position = self.locate(start)
+        base = len(self.alphabet)
+        number = max(0, min(number, base**length - position))
+
+        # The last digits are calculated over arrays of int64, the first
+        # ones, the same for many candidates, one time for every prefix.
+        low_length = 0
+        while low_length < length and base ** (low_length + 1) < 1 << 62:
+            low_length += 1
+
+        alphabet = np.frombuffer(self.alphabet, dtype=np.uint8)
+        candidates = np.empty((number, length), dtype=np.uint8)
+        done = 0
+
+        while done < number:
+            high, low = divmod(position + done, base**low_length)
+            size = min(number - done, base**low_length - low)
+
+            lows = np.arange(low, low + size, dtype=np.int64)
+            for digit_number in range(length - 1, length - low_length - 1, -1):
+                lows, digits = np.divmod(lows, base)
+                candidates[done : done + size, digit_number] = alphabet[digits]
+
+            candidates[done : done + size, : length - low_length] = (
+                np.frombuffer(
+                    self.position_to_bytes(high, length - low_length),
+                    dtype=np.uint8,
+                )
+            )
+
+            done += size
+
+        return candidates
+
+    def batches(
+        self,
+        start: int = 0,
+        stop: Optional[int] = None,
+        batch_size: int = BATCH_SIZE,
+        packed: bool = False,
+    ) -> Iterator[Tuple[int, List[bytes] | np.ndarray]]:
+        """
+        Iterates over the candidates in batches of the same length, so they can
+        be given to "uab_md5_batch", or to "uab_md5_packed" if they are packed.
+        The first batches are smaller and the size doubles until the given
+        one, so searches that end early try less candidates.
+
+        Parameters
+        ----------
+        start : int, optional
+            Index of the first candidate. The default is 0.
+        stop : Optional[int], optional
+            Index of the first candidate not to give. The default is None, all
+            of them until the last one.
+        batch_size : int, optional
+            Maximum number of candidates of a batch. The default is
+            BATCH_SIZE.
+        packed : bool, optional
+            Give the candidates as rows of an array, see "packed_batch". The
+            default is False, as a list of bytes.
+
+        Yields
+        ------
+        Iterator[Tuple[int, List[bytes] | np.ndarray]]
+            Index of the first candidate of the batch and the candidates.
+
+        """
+        if stop is None or stop > self.number_candidates:
+            stop = self.number_candidates
+        size = min(BATCH_SIZE_START, batch_size)
+
+        while start < stop:
+            length, position = self.locate(start)
+            number = min(
+                size, stop - start, len(self.alphabet) ** length - position
+            )
+
+            if packed:
+                yield start, self.packed_batch(start, number)
+            else:
+                yield start, self.batch(start, number)
+
+            start += number
+            size = min(2 * size, batch_size)
+
+
+SHARED_BEST_INDEX = None
+
+
+def init_search_worker(best_index) -> None:
+    """
+    Initiates a worker process of the parallel searches, saving the shared
+    value with the lowest index found until now.
+
+    Parameters
+    ----------
+    best_index : multiprocessing.Value
+        Shared value with the lowest index found by any worker.
+
+    Returns
+    -------
+    None.
+
+    """
+    global SHARED_BEST_INDEX  # pylint: disable=global-statement
+    SHARED_BEST_INDEX = best_index
+
+
+def second_preimage_range(
+    to_match_hash: int,
+    message_bytes: bytes,
+    num_bits: int,
+    space: CandidateSpace,
+    start: int,
+    stop: int,
+) -> Optional[int]:
+    """
+    Searches, among the candidates with index between start and stop, the
+    first one with the same hash as the message. Stops as soon as other
+    worker has found a candidate before this range.
+
+    Parameters
+    ----------
+    to_match_hash : int
+        Hash of the original message.
+    message_bytes : bytes
+        Bytes of the original message, it cannot be the result.
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    space : CandidateSpace
+        Candidates of the search.
+    start : int
+        Index of the first candidate to try.
+    stop : int
+        Index of the first candidate not to try.
+
+    Returns
+    -------
+    Optional[int]
+        Index of the candidate found or None if there is no candidate in the
+        range or other worker found one before the range.
+
+    """
+    for batch_start, batch in space.batches(start, stop, packed=True):
+        if (
+            SHARED_BEST_INDEX is not None
+            and SHARED_BEST_INDEX.value < batch_start
+        ):
+            return None
+
+        for position in np.flatnonzero(
+            uab_md5_packed_matches(
+                batch, batch.shape[1], num_bits, to_match_hash
+            )
+        ):
+            if message_bytes != batch[position].tobytes():
+                return batch_start + int(position)
+
+    return None
+
+
+def parallel_second_preimage(
+    message: str,
+    num_bits: int,
+    workers: int,
+    checkpoint: Optional["SearchCheckpoint"] = None,
+    monitor: Optional["SearchMonitor"] = None,
+    resume: bool = True,
+) -> Optional[Tuple[str, int]]:
+    """
+    Given a message, calculates a new message with the same hash, splitting
+    the candidates in ranges tried by a pool of processes. The result is the
+    same as "second_preimage" would return without workers.
+
+    Parameters
+    ----------
+    message : str
+        Original message, which we want to find a collission in the hash.
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    workers : int
+        Number of processes to use.
+    checkpoint : Optional[SearchCheckpoint], optional
+        Checkpoint to continue from and update with the index of the first
+        range not finished. The default is None.
+    monitor : Optional[SearchMonitor], optional
+        Monitor updated with the index of the first range not finished. The
+        default is None.
+    resume : bool, optional
+        Continue from the checkpoint, if it was saved. The default is True.
+
+    Returns
+    -------
+    Optional[Tuple[str, int]]
+        Tuple including the message we found that has the same hash and the
+        number of iterations needed, counted as if the candidates were tried
+        in order. If message not found or error occurred returns None.
+
+    """
+    to_match_hash = uab_md5(message, num_bits)
+    if to_match_hash is None:
+        return None
+
+    message_bytes = message_to_bytes(message)
+    space = CandidateSpace(min_length=1, max_length=10)
+
+    position = 0
+    if checkpoint is not None and resume:
+        loaded = checkpoint.load()
+        if loaded is not None:
+            position = loaded[0]
+
+    best_index = multiprocessing.Value("q", 2**63 - 1)
+    found_index = None
+    finished_starts = set()
+
+    with futures.ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=init_search_worker,
+        initargs=(best_index,),
+    ) as executor:
+        pending = {}
+
+        for start in range(position, space.number_candidates, SHARD_SIZE):
+            if found_index is not None and found_index < start:
+                break
+
+            pending[
+                executor.submit(
+                    second_preimage_range,
+                    to_match_hash,
+                    message_bytes,
+                    num_bits,
+                    space,
+                    start,
+                    start + SHARD_SIZE,
+                )
+            ] = start
+
+            if len(pending) < 2 * workers:
+                continue
+
+            done, _ = futures.wait(
+                pending, return_when=futures.FIRST_COMPLETED
+            )
+
+            for future in done:
+                finished_starts.add(pending.pop(future))
+                result = future.result()
+                if result is not None and (
+                    found_index is None or result < found_index
+                ):
+                    found_index = result
+                    best_index.value = found_index
+
+            # Only the ranges before the first one not finished can be skipped
+            # when continuing from the checkpoint.
+            while position in finished_starts:
+                finished_starts.remove(position)
+                position += SHARD_SIZE
+
+            if checkpoint is not None and found_index is None:
+                checkpoint.update(position)
+
+            if monitor is not None:
+                monitor.update(position, space.locate(position)[0])
+
+        for future in pending:
+            result = future.result()
+            if result is not None and (
+                found_index is None or result < found_index
+            ):
+                found_index = result
+
+    if found_index is None:
+        return None
+
+    return space.candidate(found_index).decode("latin-1"), found_index + 1
+
+
+def preimage_table_path(num_bits: int, directory: str = ".") -> str:
+    """
+    Calculates the path of the preimage table of the given number of bits.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash of the table.
+    directory : str, optional
+        Directory of the tables. The default is ".".
+
+    Returns
+    -------
+    str
+        Path of the table.
+
+    """
+    return os.path.join(directory, f"uab_md5_{num_bits}.table")
+
+
+def build_preimage_table(
+    num_bits: int, directory: str = ".", max_iterations: Optional[int] = None
+) -> str:
+    """
+    Builds the preimage table of the given number of bits, a file with, for
+    every hash, the index of the first candidate of "second_preimage" with
+    that hash, so the search can be answered reading only one entry. The
+    candidates are tried in order until every hash has one or the maximum
+    number of candidates is reached.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash of the table, the file has 8 bytes for every
+        hash.
+    directory : str, optional
+        Directory of the tables. The default is ".".
+    max_iterations : Optional[int], optional
+        Maximum number of candidates to try. The default is None, until every
+        hash has a candidate.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    str
+        Path of the table.
+
+    """
+    if not isinstance(num_bits, int):
+        raise TypeError("'num_bits' is not an integer.")
+
+    if not 1 <= num_bits <= PREIMAGE_TABLE_MAX_BITS:
+        raise ValueError("'num_bits' is too big for a preimage table.")
+
+    space = CandidateSpace(min_length=1, max_length=10)
+    stop = space.number_candidates
+    if max_iterations is not None:
+        stop = min(stop, max_iterations)
+
+    path = preimage_table_path(num_bits, directory)
+    temporary_path = path + ".tmp"
+
+    # The entries are filled in the file, so the table never has to fit in
+    # memory. Indexes are saved plus one, so zero means no candidate.
+    with open(temporary_path, "wb") as file:
+        file.truncate(PREIMAGE_TABLE_STRUCT.size + 8 * (1 << num_bits))
+
+    entries = np.memmap(
+        temporary_path,
+        dtype="<u8",
+        mode="r+",
+        offset=PREIMAGE_TABLE_STRUCT.size,
+        shape=(1 << num_bits,),
+    )
+    missing = 1 << num_bits
+    covered = 0
+
+    for start, candidates in space.batches(0, stop, packed=True):
+        hashes, positions = np.unique(
+            uab_md5_packed(candidates, candidates.shape[1], num_bits),
+            return_index=True,
+        )
+        new = entries[hashes] == 0
+        entries[hashes[new]] = start + positions[new] + 1
+        missing -= int(new.sum())
+        covered = start + len(candidates)
+
+        if missing == 0:
+            break
+
+    entries.flush()
+    del entries
+
+    with open(temporary_path, "r+b") as file:
+        file.write(
+            PREIMAGE_TABLE_STRUCT.pack(
+                PREIMAGE_TABLE_MAGIC, 1, num_bits, covered
+            )
+        )
+
+    os.replace(temporary_path, path)
+    PREIMAGE_TABLES.pop(path, None)
+
+    return path
+
+
+class PreimageTable:
+    """
+    Preimage table built by "build_preimage_table", mapped in memory so a
+    search only reads the entry of its hash.
+
+    Parameters
+    ----------
+    path : str
+        Path of the table.
+
+    Raises
+    ------
+    ValueError
+        The file is not a preimage table.
+
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.memory = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.num_bits, self.covered = (
+            PREIMAGE_TABLE_STRUCT.unpack_from(self.memory)
+        )
+
+        if (
+            magic != PREIMAGE_TABLE_MAGIC
+            or version != 1
+            or len(self.memory)
+            != PREIMAGE_TABLE_STRUCT.size + 8 * (1 << self.num_bits)
+        ):
+            self.memory.close()
+            raise ValueError(f"'{path}' is not a preimage table.")
+
+    def lookup(self, to_match_hash: int) -> Optional[int]:
+        """
+        Reads the index of the first candidate with the given hash.
+
+        Parameters
+        ----------
+        to_match_hash : int
+            Hash to search.
+
+        Returns
+        -------
+        Optional[int]
+            Index of the candidate or None if no candidate tried building the
+            table has the hash.
+
+        """
+        (entry,) = PREIMAGE_TABLE_ENTRY_STRUCT.unpack_from(
+            self.memory,
+            PREIMAGE_TABLE_STRUCT.size + 8 * to_match_hash,
+        )
+
+        return entry - 1 if entry else None
+
+
+def open_preimage_table(
+    num_bits: int, directory: str
+) -> Optional[PreimageTable]:
+    """
+    Opens the preimage table of the given number of bits, keeping it open for
+    the next searches.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash of the table.
+    directory : str
+        Directory of the tables.
+
+    Returns
+    -------
+    Optional[PreimageTable]
+        The table or None if there is no table for the number of bits.
+
+    """
+    path = preimage_table_path(num_bits, directory)
+
+    if path not in PREIMAGE_TABLES:
+        if not os.path.exists(path):
+            return None
+
+        PREIMAGE_TABLES[path] = PreimageTable(path)
+
+    return PREIMAGE_TABLES[path]
+
+
+def rainbow_point_message(point: int, num_bits: int) -> bytes:
+    """
+    Calculates the message of a point of a rainbow table, its num_bits plus
+    8 bits, so the points are not limited to the values of the hash.
+
+    Parameters
+    ----------
+    point : int
+        Point of the table.
+    num_bits : int
+        Number bits of the hash of the table.
+
+    Returns
+    -------
+    bytes
+        Message of the point.
+
+    """
+    return point.to_bytes((num_bits + 15) // 8, byteorder="big")
+
+
+def rainbow_points_hash(points: np.ndarray, num_bits: int) -> np.ndarray:
+    """
+    Calculates the hash of the messages of many points of a rainbow table,
+    see "rainbow_point_message", at the same time. Does not check the
+    parameters.
+
+    Parameters
+    ----------
+    points : np.ndarray
+        Array of uint64 with the points.
+    num_bits : int
+        Number bits of the hash of the table.
+
+    Returns
+    -------
+    np.ndarray
+        Array of uint64 with the hashes.
+
+    """
+    length = (num_bits + 15) // 8
+
+    return uab_md5_packed(
+        points.astype(">u8").view(np.uint8).reshape(-1, 8)[:, 8 - length :],
+        length,
+        num_bits,
+    )
+
+
+def rainbow_reductions(
+    num_bits: int, chain_length: int, table_number: int
+) -> np.ndarray:
+    """
+    Calculates the reduction of every column of a rainbow table, the hash of
+    a column is transformed into the point of the next one with a xor with
+    the reduction, distinct for every column and table. The reductions have
+    8 bits more than the hash, so the points are not limited to the values
+    of the hash, but the columns share them: a point can be in many columns
+    and chains only merge when they meet in the same column.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash of the table.
+    chain_length : int
+        Number of columns of the table.
+    table_number : int
+        Number of the table.
+
+    Returns
+    -------
+    np.ndarray
+        Array of uint64 with the reduction of every column.
+
+    """
+    return np.array(
+        [
+            (
+                (column + 1) * 0x9E3779B97F4A7C15
+                + (table_number + 1) * 0xC2B2AE3D27D4EB4F
+            )
+            & ((1 << (num_bits + 8)) - 1)
+            for column in range(chain_length)
+        ],
+        dtype=np.uint64,
+    )
+
+
+def rainbow_chains(
+    num_bits: int,
+    chain_length: int,
+    table_number: int,
+    starts: np.ndarray,
+) -> np.ndarray:
+    """
+    Walks the chains of a rainbow table from the given starts, all of them at
+    the same time.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash of the table.
+    chain_length : int
+        Number of columns of the table.
+    table_number : int
+        Number of the table.
+    starts : np.ndarray
+        Array of uint64 with the starts of the chains.
+
+    Returns
+    -------
+    np.ndarray
+        Array of uint64 with the ends of the chains.
+
+    """
+    reductions = rainbow_reductions(num_bits, chain_length, table_number)
+    points = starts
+
+    for column in range(chain_length):
+        points = rainbow_points_hash(points, num_bits) ^ reductions[column]
+
+    return points
+
+
+def rainbow_success_probability(
+    num_bits: int, chains: int, chain_length: int, tables: int = 1
+) -> float:
+    """
+    Calculates the probability of a rainbow table to find a preimage of a
+    hash. Chains that merge are the same from there to the end and only one
+    of them is kept, so every column of a table has as many distinct points
+    as chains are left at the end, and a hash is found if it is the hash of
+    a point of any column of any table.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash of the table.
+    chains : int
+        Number of chains of every table, before removing the ones that merge.
+    chain_length : int
+        Number of columns of the tables.
+    tables : int, optional
+        Number of tables. The default is 1.
+
+    Returns
+    -------
+    float
+        Probability of finding a preimage.
+
+    """
+    number_hashes = float(1 << num_bits)
+    distinct_points = float(chains)
+
+    # The reductions do not merge points, the hash of every column does.
+    for _ in range(chain_length):
+        distinct_points = number_hashes * (
+            1 - exp(-distinct_points / number_hashes)
+        )
+
+    probability_not_found = (1 - distinct_points / number_hashes) ** (
+        chain_length * tables
+    )
+
+    return 1 - probability_not_found
+
+
+def build_rainbow_table(
+    num_bits: int,
+    path: str,
+    chain_length: Optional[int] = None,
+    success_probability: float = 0.9,
+    workers: Optional[int] = None,
+) -> str:
+    """
+    Builds rainbow tables for second preimages of the given number of bits,
+    chains of the hash over its own output with a distinct reduction every
+    column, keeping only the start and end of every chain. There are as many
+    tables as needed to get the given probability of finding a preimage, the
+    chains can be calculated by many processes. The chains are split in
+    buckets by their end in temporary files next to the tables, so only the
+    biggest of 2 to the 22 chains or a 256th of a table is in memory.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash of the table, a value between 1 and 56.
+    path : str
+        Path of the file of the tables.
+    chain_length : Optional[int], optional
+        Number of columns of the tables, longer chains use less memory but
+        every search takes more time. The default is None, 2 to the third of
+        num_bits.
+    success_probability : float, optional
+        Probability of finding a preimage of a hash. The default is 0.9.
+    workers : Optional[int], optional
+        Number of processes to split the chains between. The default is None,
+        calculating them in this process.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    str
+        Path of the file of the tables.
+
+    """
+    # pylint: disable=too-many-locals
+    if not isinstance(num_bits, int):
+        raise TypeError("'num_bits' is not an integer.")
+
+    if not isinstance(success_probability, float):
+        raise TypeError("'success_probability' is not a float.")
+
+    if not 1 <= num_bits <= RAINBOW_TABLE_MAX_BITS:
+        raise ValueError("'num_bits' is too big for a rainbow table.")
+
+    if not 0 < success_probability < 1:
+        raise ValueError("'success_probability' is not a probability.")
+
+    if chain_length is None:
+        chain_length = 1 << max(1, num_bits // 3)
+
+    if not isinstance(chain_length, int):
+        raise TypeError("'chain_length' is not an integer.")
+
+    if chain_length < 1:
+        raise ValueError("'chain_length' is not a valid length.")
+
+    # More chains than this mostly merge with the others.
+    chains = min(1 << num_bits, -(-2 * (1 << num_bits) // (chain_length + 2)))
+    tables = 1
+    while (
+        rainbow_success_probability(num_bits, chains, chain_length, tables)
+        < success_probability
+    ):
+        tables += 1
+
+    # The ends are sorted by buckets of their first bits, so only a bucket
+    # of chains is in memory at a time. The 8 bits over the hash are the
+    # same for every end of a table, the ones of the last reduction.
+    bucket_bits = min(
+        num_bits,
+        RAINBOW_TABLE_BUCKET_BITS,
+        ((chains - 1) // RAINBOW_TABLE_BUCKET_CHAINS).bit_length(),
+    )
+    bucket_shift = np.uint64(num_bits - bucket_bits)
+    bucket_mask = np.uint64((1 << bucket_bits) - 1)
+    chain_dtype = np.dtype([("start", "<u8"), ("end", "<u8")])
+    temporary_path = path + ".tmp"
+
+    with ExitStack() as stack:
+        directory = stack.enter_context(
+            tempfile.TemporaryDirectory(
+                dir=os.path.dirname(os.path.abspath(path))
+            )
+        )
+        executor = None
+        if workers is not None and workers > 1:
+            executor = stack.enter_context(
+                futures.ProcessPoolExecutor(max_workers=workers)
+            )
+        file = stack.enter_context(open(temporary_path, "wb"))
+        file.write(
+            RAINBOW_TABLE_STRUCT.pack(
+                RAINBOW_TABLE_MAGIC, 1, num_bits, tables, chain_length
+            )
+        )
+
+        for table_number in range(tables):
+            bucket_paths = [
+                os.path.join(directory, f"{table_number}.{bucket}")
+                for bucket in range(1 << bucket_bits)
+            ]
+
+            with ExitStack() as bucket_stack:
+                bucket_files = [
+                    bucket_stack.enter_context(open(bucket_path, "wb"))
+                    for bucket_path in bucket_paths
+                ]
+
+                for first in range(0, chains, RAINBOW_TABLE_BUCKET_CHAINS):
+                    stop = min(first + RAINBOW_TABLE_BUCKET_CHAINS, chains)
+                    chain_starts = [
+                        np.arange(
+                            start, min(start + BATCH_SIZE, stop), dtype="<u8"
+                        )
+                        for start in range(first, stop, BATCH_SIZE)
+                    ]
+                    arguments = (
+                        repeat(num_bits),
+                        repeat(chain_length),
+                        repeat(table_number),
+                        chain_starts,
+                    )
+
+                    new_chains = np.empty(stop - first, dtype=chain_dtype)
+                    new_chains["start"] = np.arange(first, stop, dtype="<u8")
+                    new_chains["end"] = np.concatenate(
+                        list(
+                            map(rainbow_chains, *arguments)
+                            if executor is None
+                            else executor.map(rainbow_chains, *arguments)
+                        )
+                    )
+
+                    buckets = (new_chains["end"] >> bucket_shift) & bucket_mask
+                    new_chains = new_chains[np.argsort(buckets, kind="stable")]
+                    bounds = np.cumsum(
+                        np.bincount(buckets, minlength=1 << bucket_bits)
+                    )
+                    for bucket_file, bucket_chains in zip(
+                        bucket_files, np.split(new_chains, bounds[:-1])
+                    ):
+                        bucket_chains.tofile(bucket_file)
+
+            # Chains with the same end are the same from where they merge,
+            # only the first one is kept, sorted by its end to search them.
+            ends_path = os.path.join(directory, f"{table_number}.ends")
+            number_chains = 0
+            with open(ends_path, "wb") as ends_file:
+                file.write(PREIMAGE_TABLE_ENTRY_STRUCT.pack(0))
+                count_offset = file.tell() - PREIMAGE_TABLE_ENTRY_STRUCT.size
+
+                for bucket_path in bucket_paths:
+                    bucket_chains = np.fromfile(bucket_path, dtype=chain_dtype)
+                    os.remove(bucket_path)
+                    ends, positions = np.unique(
+                        bucket_chains["end"], return_index=True
+                    )
+                    bucket_chains["start"][positions].tofile(file)
+                    ends.tofile(ends_file)
+                    number_chains += len(ends)
+
+            with open(ends_path, "rb") as ends_file:
+                shutil.copyfileobj(ends_file, file)
+            os.remove(ends_path)
+
+            end_offset = file.tell()
+            file.seek(count_offset)
+            file.write(PREIMAGE_TABLE_ENTRY_STRUCT.pack(number_chains))
+            file.seek(end_offset)
+
+    os.replace(temporary_path, path)
+    RAINBOW_TABLES.pop(path, None)
+
+    return path
+
+
+class RainbowTable:
+    """
+    Rainbow tables built by "build_rainbow_table", mapped in memory.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file of the tables.
+
+    Raises
+    ------
+    ValueError
+        The file is not a rainbow table.
+
+    """
+
+    def __init__(self, path: str):
+        with open(path, "rb") as file:
+            self.memory = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, self.num_bits, tables, self.chain_length = (
+            RAINBOW_TABLE_STRUCT.unpack_from(self.memory)
+        )
+
+        if magic != RAINBOW_TABLE_MAGIC or version != 1:
+            self.memory.close()
+            raise ValueError(f"'{path}' is not a rainbow table.")
+
+        self.tables = []
+        offset = RAINBOW_TABLE_STRUCT.size
+
+        for _ in range(tables):
+            (chains,) = PREIMAGE_TABLE_ENTRY_STRUCT.unpack_from(
+                self.memory, offset
+            )
+            offset += PREIMAGE_TABLE_ENTRY_STRUCT.size
+            starts = np.frombuffer(
+                self.memory, dtype="<u8", count=chains, offset=offset
+            )
+            offset += 8 * chains
+            ends = np.frombuffer(
+                self.memory, dtype="<u8", count=chains, offset=offset
+            )
+            offset += 8 * chains
+            self.tables.append((starts, ends))
+
+    def lookup(
+        self, to_match_hash: int, message_bytes: bytes = b""
+    ) -> Tuple[Optional[bytes], int]:
+        """
+        Searches a message with the given hash in the tables. For every
+        column, the hash is supposed to be there and walked until the end of
+        the chain, all the columns at the same time, and the chains with that
+        end are walked from the start to check it.
+
+        Parameters
+        ----------
+        to_match_hash : int
+            Hash to search.
+        message_bytes : bytes, optional
+            Message that cannot be the result. The default is b"".
+
+        Returns
+        -------
+        Tuple[Optional[bytes], int]
+            Message found, or None if not found, and number of hashes
+            calculated.
+
+        """
+        chain_length = self.chain_length
+        iterations = 0
+
+        for table_number, (starts, ends) in enumerate(self.tables):
+            reductions = rainbow_reductions(
+                self.num_bits, chain_length, table_number
+            )
+
+            # The end of the chain for every column the hash could be in.
+            points = np.uint64(to_match_hash) ^ reductions
+            for column in range(1, chain_length):
+                points[:column] = (
+                    rainbow_points_hash(points[:column], self.num_bits)
+                    ^ reductions[column]
+                )
+                iterations += column
+
+            positions = np.searchsorted(ends, points)
+            found = (positions < len(ends)) & (
+                ends[np.minimum(positions, len(ends) - 1)] == points
+            )
+            columns = np.flatnonzero(found)
+            points = starts[positions[columns]].copy()
+
+            # Walk the chains found until the column the hash should be in.
+            for column in range(chain_length):
+                walking = columns > column
+                if not walking.any():
+                    break
+
+                points[walking] = (
+                    rainbow_points_hash(points[walking], self.num_bits)
+                    ^ reductions[column]
+                )
+                iterations += int(walking.sum())
+
+            iterations += len(points)
+            hashes = rainbow_points_hash(points, self.num_bits)
+            for point, point_hash in zip(points.tolist(), hashes.tolist()):
+                candidate = rainbow_point_message(point, self.num_bits)
+                if point_hash == to_match_hash and candidate != message_bytes:
+                    return candidate, iterations
+
+        return None, iterations
+
+
+def open_rainbow_table(path: str) -> RainbowTable:
+    """
+    Opens the rainbow tables of the given file, keeping them open for the
+    next searches.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file of the tables.
+
+    Returns
+    -------
+    RainbowTable
+        The tables.
+
+    """
+    if path not in RAINBOW_TABLES:
+        RAINBOW_TABLES[path] = RainbowTable(path)
+
+    return RAINBOW_TABLES[path]
+
+
+def second_preimage(
+    message: str,
+    num_bits: int,
+    workers: Optional[int] = None,
+    checkpoint: Optional[str] = None,
+    checkpoint_interval: Optional[float] = 60.0,
+    checkpoint_iterations: Optional[int] = None,
+    resume: bool = False,
+    table_directory: Optional[str] = None,
+    rainbow_table: Optional[str] = None,
+    progress: Optional[Callable[["SearchProgress"], None]] = None,
+    progress_interval: float = 1.0,
+) -> Optional[Tuple[str, int]]:
+    """
+    Given a message, calculates a new message with the same hash. Does this
+    using brute forcing.
+
+    Parameters
+    ----------
+    message : str
+        Original message, which we want to find a collission in the hash.
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    workers : Optional[int], optional
+        Number of processes to split the search between, the result is the
+        same as searching in only one. The default is None, searching in this
+        process.
+    checkpoint : Optional[str], optional
+        Path of the file where the progress of the search is saved from time
+        to time. The default is None, no checkpoints.
+    checkpoint_interval : Optional[float], optional
+        Seconds between checkpoints. The default is 60.0.
+    checkpoint_iterations : Optional[int], optional
+        Candidates tried between checkpoints, a checkpoint is saved when
+        either of both is reached. The default is None, only the time counts.
+    resume : bool, optional
+        Continue from the checkpoint file, if it exists, the result is the
+        same as searching from the start. The default is False.
+    table_directory : Optional[str], optional
+        Directory of the preimage tables, built with "build_preimage_table".
+        If there is a table for the number of bits the search is answered
+        with it, the result is the same. The default is None, no tables.
+    rainbow_table : Optional[str], optional
+        Path of the rainbow tables, built with "build_rainbow_table", for
+        numbers of bits too big to try every candidate. If the tables find a
+        message it is returned, not the first candidate of the search, else
+        the search continues. The default is None, no tables.
+    progress : Optional[Callable[[SearchProgress], None]], optional
+        Function called with the progress of the search from time to time.
+        The default is None, no progress.
+    progress_interval : float, optional
+        Seconds between calls to progress. The default is 1.0.
+
+    Returns
+    -------
+    Optional[Tuple[str, int]]
+        Tuple including the message we found that has the same hash and the
+        number of iterations needed. If message not found or error occurred
+        returns None.
+
+    """
+    # pylint: disable=too-many-arguments
+    # pylint: disable=too-many-locals
+    to_match_hash = uab_md5(message, num_bits)
+    if to_match_hash is None:
+        return None
+
+    message_bytes = message_to_bytes(message)
+
+    if rainbow_table is not None:
+        table = open_rainbow_table(rainbow_table)
+
+        if table.num_bits == num_bits:
+            candidate, iterations = table.lookup(to_match_hash, message_bytes)
+
+            if candidate is not None:
+                return candidate.decode("latin-1"), iterations
+
+    table_position = 0
+    if table_directory is not None:
+        table = open_preimage_table(num_bits, table_directory)
+
+        if table is not None:
+            space = CandidateSpace(min_length=1, max_length=10)
+            index = table.lookup(to_match_hash)
+
+            if index is not None:
+                candidate = space.candidate(index)
+
+                if candidate != message_bytes:
+                    return candidate.decode("latin-1"), index + 1
+
+                table_position = index + 1
+            else:
+                # No candidate tried building the table has the hash.
+                table_position = table.covered
+
+    search_checkpoint = None
+    if checkpoint is not None:
+        search_checkpoint = SearchCheckpoint(
+            checkpoint,
+            CHECKPOINT_SECOND_PREIMAGE,
+            num_bits,
+            uab_md5_bytes(message_bytes, 128),
+            checkpoint_interval,
+            checkpoint_iterations,
+        )
+
+    search_monitor = None
+    if progress is not None:
+        search_monitor = SearchMonitor(
+            progress, CHECKPOINT_SECOND_PREIMAGE, num_bits, progress_interval
+        )
+
+    if workers is not None and workers > 1 and table_position == 0:
+        return parallel_second_preimage(
+            message,
+            num_bits,
+            workers,
+            search_checkpoint,
+            search_monitor,
+            resume,
+        )
+
+    position = table_position
+    if search_checkpoint is not None and resume:
+        loaded = search_checkpoint.load()
+        if loaded is not None:
+            position = max(position, loaded[0])
+
+    for start, new_messages in CandidateSpace(
+        min_length=1, max_length=10
+    ).batches(position, packed=True):
+        if search_checkpoint is not None:
+            search_checkpoint.update(start)
+
+        if search_monitor is not None:
+            search_monitor.update(start, new_messages.shape[1])
+
+        for position in np.flatnonzero(
+            uab_md5_packed_matches(
+                new_messages, new_messages.shape[1], num_bits, to_match_hash
+            )
+        ):
+            if message_bytes != new_messages[position].tobytes():
+                return (
+                    new_messages[position].tobytes().decode("latin-1"),
+                    start + int(position) + 1,
+                )
+
+    return None
+
+
+def second_preimage_many(
+    messages: Sequence[str],
+    num_bits: int,
+    max_iterations: Optional[int] = None,
+) -> List[Optional[Tuple[str, int]]]:
+    """
+    Given many messages, calculates for every one of them a new message with
+    the same hash, as "second_preimage" would. The candidates are tried only
+    once for all the messages, every hash is searched between the hashes of
+    the messages still without result, and the search ends when all of them
+    have one.
+
+    Parameters
+    ----------
+    messages : Sequence[str]
+        Original messages, which we want to find a collission in the hash.
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    max_iterations : Optional[int], optional
+        Maximum number of candidates to try. The default is None, no maximum.
+
+    Returns
+    -------
+    List[Optional[Tuple[str, int]]]
+        For every message, the same as "second_preimage", tuple including the
+        message we found that has the same hash and the number of iterations
+        needed. If message not found, in the maximum number of candidates, or
+        error occurred, None.
+
+    """
+    results = [None] * len(messages)
+
+    # Positions of the messages without result, by their hash.
+    targets = {}
+    for position, message in enumerate(messages):
+        to_match_hash = uab_md5(message, num_bits)
+        if to_match_hash is not None:
+            targets.setdefault(to_match_hash, []).append(
+                (position, message_to_bytes(message))
+            )
+
+    space = CandidateSpace(min_length=1, max_length=10)
+
+    # Sorted once, the hashes already answered are only marked as found.
+    if num_bits <= 64:
+        target_hashes = np.array(sorted(targets), dtype=np.uint64)
+        pending = np.ones(len(target_hashes), dtype=bool)
+
+    for start, new_messages in space.batches(0, max_iterations, packed=True):
+        if not targets:
+            break
+
+        hashes = uab_md5_packed(new_messages, new_messages.shape[1], num_bits)
+
+        if num_bits <= 64:
+            indexes = np.minimum(
+                np.searchsorted(target_hashes, hashes), len(target_hashes) - 1
+            )
+            found = np.flatnonzero(
+                (target_hashes[indexes] == hashes) & pending[indexes]
+            )
+        else:
+            found = [
+                position
+                for position, hash_val in enumerate(hashes.tolist())
+                if hash_val in targets
+            ]
+
+        for position in found:
+            hash_val = int(hashes[position])
+            if hash_val not in targets:
+                continue
+
+            candidate = new_messages[position].tobytes()
+            remaining = []
+
+            for message_position, message_bytes in targets[hash_val]:
+                if message_bytes == candidate:
+                    remaining.append((message_position, message_bytes))
+                else:
+                    results[message_position] = (
+                        candidate.decode("latin-1"),
+                        start + int(position) + 1,
+                    )
+
+            if remaining:
+                targets[hash_val] = remaining
+            else:
+                del targets[hash_val]
+                if num_bits <= 64:
+                    pending[np.searchsorted(target_hashes, hash_val)] = False
+
+    return results
+
+
+class CompactHashIndex:
+    """
+    Table from hashes to the position of the candidate with that hash, with
+    open addressing over two arrays of integers, so every entry uses a few
+    bytes instead of the Python objects of a dictionary.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number of bits of the hashes, hashes of 32 or less bits and positions
+        are stored in 4 bytes, if not in 8 bytes. Of hashes of more than 64
+        bits only the last 64 are stored, so a match must be checked.
+    capacity : int, optional
+        Initial number of slots, rounded up to a power of two, it grows when
+        three quarters are used. The default is 1024.
+
+    """
+
+    def __init__(self, num_bits: int, capacity: int = 1024):
+        self.typecode = "I" if num_bits <= 32 else "Q"
+        self.length = 0
+        self.keys = array(self.typecode)
+        self.values = array(self.typecode)
+        self.resize(1 << max(3, (capacity - 1).bit_length()))
+
+    def __len__(self) -> int:
+        return self.length
+
+    @property
+    def nbytes(self) -> int:
+        """
+        Bytes used by the arrays of the table.
+
+        Returns
+        -------
+        int
+            Number of bytes.
+
+        """
+        return (len(self.keys) + len(self.values)) * self.keys.itemsize
+
+    def resize(self, capacity: int) -> None:
+        """
+        Changes the number of slots of the table, inserting again every entry.
+
+        Parameters
+        ----------
+        capacity : int
+            New number of slots, must be a power of two.
+
+        Returns
+        -------
+        None.
+
+        """
+        old_keys = self.keys
+        old_values = self.values
+
+        self.keys = array(self.typecode, bytes(capacity * old_keys.itemsize))
+        self.values = array(self.typecode, bytes(capacity * old_keys.itemsize))
+        self.length = 0
+
+        for key, value in zip(old_keys, old_values):
+            if value:
+                self.setdefault(key, value - 1)
+
+    def setdefault(self, key: int, index: int) -> int:
+        """
+        Inserts the position of a candidate with the given hash, if there is
+        none already.
+
+        Parameters
+        ----------
+        key : int
+            Hash of the candidate.
+        index : int
+            Position of the candidate.
+
+        Returns
+        -------
+        int
+            Position stored for the hash, the one given if it was not in the
+            table.
+
+        """
+        key &= 0xFFFFFFFFFFFFFFFF
+        keys = self.keys
+        values = self.values
+        mask = len(keys) - 1
+        slot = key & mask
+
+        while values[slot]:
+            if keys[slot] == key:
+                return values[slot] - 1
+
+            slot = (slot + 1) & mask
+
+        keys[slot] = key
+        values[slot] = index + 1
+        self.length += 1
+
+        if 4 * self.length > 3 * len(keys):
+            self.resize(2 * len(keys))
+
+        return index
+
+    def get(self, key: int) -> Optional[int]:
+        """
+        Searches the position of the candidate with the given hash.
+
+        Parameters
+        ----------
+        key : int
+            Hash to search.
+
+        Returns
+        -------
+        Optional[int]
+            Position of the candidate or None if no candidate has the hash.
+
+        """
+        key &= 0xFFFFFFFFFFFFFFFF
+        keys = self.keys
+        values = self.values
+        mask = len(keys) - 1
+        slot = key & mask
+
+        while values[slot]:
+            if keys[slot] == key:
+                return values[slot] - 1
+
+            slot = (slot + 1) & mask
+
+        return None
+
+
+class SearchCheckpoint:
+    """
+    Checkpoint of a brute force search saved in a file, with the index of the
+    next candidate to try and, for collisions, the table of the hashes. The
+    file is written to a temporary file and then renamed, so a search killed
+    while saving keeps the previous checkpoint.
+
+    Parameters
+    ----------
+    path : str
+        Path of the file of the checkpoint.
+    kind : int
+        Kind of search, CHECKPOINT_SECOND_PREIMAGE or CHECKPOINT_COLLISION.
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    target : int, optional
+        128-bit hash of the original message of a second preimage, so the
+        checkpoint is not used for other message. The default is 0.
+    interval : Optional[float], optional
+        Seconds between checkpoints. The default is 60.0.
+    iterations : Optional[int], optional
+        Candidates tried between checkpoints, a checkpoint is saved when
+        either of both is reached. The default is None, only the time counts.
+
+    """
+
+    # pylint: disable=too-many-arguments
+    def __init__(
+        self,
+        path: str,
+        kind: int,
+        num_bits: int,
+        target: int = 0,
+        interval: Optional[float] = 60.0,
+        iterations: Optional[int] = None,
+    ):
+        self.path = path
+        self.kind = kind
+        self.num_bits = num_bits
+        self.target = target
+        self.interval = interval
+        self.iterations = iterations
+        self.last_time = perf_counter()
+        self.last_position = 0
+
+    def load(self) -> Optional[Tuple[int, Optional[CompactHashIndex]]]:
+        """
+        Reads the checkpoint of the file, if there is one.
+
+        Raises
+        ------
+        ValueError
+            The file is not a checkpoint of the same search.
+
+        Returns
+        -------
+        Optional[Tuple[int, Optional[CompactHashIndex]]]
+            Index of the next candidate to try and the table of the hashes, or
+            None if the file does not exist.
+
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        with open(self.path, "rb") as file:
+            data = file.read()
+
+        (
+            magic,
+            version,
+            kind,
+            typecode,
+            num_bits,
+            target,
+            position,
+            slots,
+            length,
+        ) = CHECKPOINT_STRUCT.unpack_from(data)
+
+        if (
+            magic != CHECKPOINT_MAGIC
+            or version != 1
+            or kind != self.kind
+            or num_bits != self.num_bits
+            or int.from_bytes(target, byteorder="big") != self.target
+        ):
+            raise ValueError(
+                f"'{self.path}' is not a checkpoint of the same search."
+            )
+
+        self.last_position = position
+
+        if typecode == 0:
+            return position, None
+
+        hash_index = CompactHashIndex(num_bits)
+        array_size = slots * hash_index.keys.itemsize
+        hash_index.keys = array(chr(typecode))
+        hash_index.keys.frombytes(
+            data[CHECKPOINT_STRUCT.size : CHECKPOINT_STRUCT.size + array_size]
+        )
+        hash_index.values = array(chr(typecode))
+        hash_index.values.frombytes(
+            data[
+                CHECKPOINT_STRUCT.size
+                + array_size : CHECKPOINT_STRUCT.size
+                + 2 * array_size
+            ]
+        )
+        hash_index.length = length
+
+        return position, hash_index
+
+    def save(
+        self, position: int, hash_index: Optional[CompactHashIndex] = None
+    ) -> None:
+        """
+        Writes the checkpoint to the file.
+
+        Parameters
+        ----------
+        position : int
+            Index of the next candidate to try.
+        hash_index : Optional[CompactHashIndex], optional
+            Table of the hashes of the candidates tried. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        temporary_path = self.path + ".tmp"
+
+        with open(temporary_path, "wb") as file:
+            file.write(
+                CHECKPOINT_STRUCT.pack(
+                    CHECKPOINT_MAGIC,
+                    1,
+                    self.kind,
+                    0 if hash_index is None else ord(hash_index.typecode),
+                    self.num_bits,
+                    self.target.to_bytes(16, byteorder="big"),
+                    position,
+                    0 if hash_index is None else len(hash_index.keys),
+                    0 if hash_index is None else len(hash_index),
+                )
+            )
+
+            if hash_index is not None:
+                hash_index.keys.tofile(file)
+                hash_index.values.tofile(file)
+
+            file.flush()
+            os.fsync(file.fileno())
+
+        os.replace(temporary_path, self.path)
+
+        self.last_time = perf_counter()
+        self.last_position = position
+
+    def update(
+        self, position: int, hash_index: Optional[CompactHashIndex] = None
+    ) -> None:
+        """
+        Writes the checkpoint to the file if the seconds or candidates between
+        checkpoints have been reached.
+
+        Parameters
+        ----------
+        position : int
+            Index of the next candidate to try.
+        hash_index : Optional[CompactHashIndex], optional
+            Table of the hashes of the candidates tried. The default is None.
+
+        Returns
+        -------
+        None.
+
+        """
+        if (
+            self.interval is not None
+            and perf_counter() - self.last_time >= self.interval
+        ) or (
+            self.iterations is not None
+            and position - self.last_position >= self.iterations
+        ):
+            self.save(position, hash_index)
+
+
+class SearchProgress(NamedTuple):
+    """
+    Progress of a search, given to the progress callback of
+    "second_preimage" and "collision".
+
+    Attributes
+    ----------
+    candidates : int
+        Candidates tried, or hashes calculated by the walks of the rho and
+        distinguished methods.
+    elapsed : float
+        Seconds since the search started.
+    hashes_per_second : float
+        Hashes calculated per second since the search started.
+    candidate_length : int
+        Length in bytes of the candidates being tried.
+    table_entries : int
+        Hashes kept by the search.
+    table_bytes : int
+        Bytes used by the hashes kept by the search.
+    expected_remaining : float
+        Expected number of hashes until the search ends, for a random hash.
+    expected_seconds : float
+        Expected seconds until the search ends at the current rate.
+
+    """
+
+    candidates: int
+    elapsed: float
+    hashes_per_second: float
+    candidate_length: int
+    table_entries: int
+    table_bytes: int
+    expected_remaining: float
+    expected_seconds: float
+
+
+def expected_remaining_work(
+    kind: int, num_bits: int, candidates: int
+) -> float:
+    """
+    Calculates the expected number of hashes until a search ends, knowing it
+    has not ended after the given number of candidates. A second preimage is
+    found with probability 2 to the minus num_bits every candidate, so the
+    candidates tried do not change the expected remaining 2 to the num_bits.
+    A collision of the first k hashes happens with probability about
+    1 - exp(-k^2 / 2^(num_bits + 1)), so the expected remaining hashes start
+    at sqrt(pi * 2^num_bits / 2) and decrease with the candidates tried.
+
+    Parameters
+    ----------
+    kind : int
+        Kind of search, CHECKPOINT_SECOND_PREIMAGE or CHECKPOINT_COLLISION.
+    num_bits : int
+        Number bits of the hash of the search.
+    candidates : int
+        Candidates tried.
+
+    Returns
+    -------
+    float
+        Expected number of hashes until the search ends.
+
+    """
+    number_hashes = float(1 << num_bits)
+
+    if kind == CHECKPOINT_SECOND_PREIMAGE:
+        return number_hashes
+
+    ratio = candidates / sqrt(2 * number_hashes)
+
+    # exp(x^2) * erfc(x) overflows for big x, where it is 1 / (x * sqrt(pi)).
+    if ratio < 20:
+        scaled = exp(ratio * ratio) * erfc(ratio)
+    else:
+        scaled = 1 / (ratio * sqrt(pi))
+
+    return sqrt(pi * number_hashes / 2) * scaled
+
+
+class SearchMonitor:
+    """
+    Reports the progress of a search to a callback, at most once every given
+    number of seconds. The searches only update it between batches of
+    candidates, and only if there is a callback.
+
+    Parameters
+    ----------
+    callback : Callable[[SearchProgress], None]
+        Function called with the progress.
+    kind : int
+        Kind of search, CHECKPOINT_SECOND_PREIMAGE or CHECKPOINT_COLLISION.
+    num_bits : int
+        Number bits of the hash of the search.
+    interval : float, optional
+        Seconds between reports. The default is 1.0.
+
+    """
+
+    def __init__(
+        self,
+        callback: Callable[[SearchProgress], None],
+        kind: int,
+        num_bits: int,
+        interval: float = 1.0,
+    ):
+        self.callback = callback
+        self.kind = kind
+        self.num_bits = num_bits
+        self.interval = interval
+        self.start_time = self.last_time = perf_counter()
+        self.first_candidates = None
+
+    def update(
+        self,
+        candidates: int,
+        candidate_length: int,
+        table_entries: int = 0,
+        table_bytes: int = 0,
+        force: bool = False,
+    ) -> None:
+        """
+        Reports the progress if the interval has passed since the last one.
+
+        Parameters
+        ----------
+        candidates : int
+            Candidates tried.
+        candidate_length : int
+            Length in bytes of the candidates being tried.
+        table_entries : int, optional
+            Hashes kept by the search. The default is 0.
+        table_bytes : int, optional
+            Bytes used by the hashes kept by the search. The default is 0.
+        force : bool, optional
+            Report even if the interval has not passed, for the last report
+            of a search. The default is False.
+
+        """
+        # Searches continued from a checkpoint did not try the first ones now.
+        if self.first_candidates is None:
+            self.first_candidates = candidates
+
+        now = perf_counter()
+        if now - self.last_time < self.interval and not force:
+            return
+
+        self.last_time = now
+        elapsed = now - self.start_time
+        hashes_per_second = (
+            (candidates - self.first_candidates) / elapsed
+            if elapsed > 0
+            else 0.0
+        )
+        expected_remaining = expected_remaining_work(
+            self.kind, self.num_bits, candidates
+        )
+
+        self.callback(
+            SearchProgress(
+                candidates,
+                elapsed,
+                hashes_per_second,
+                candidate_length,
+                table_entries,
+                table_bytes,
+                expected_remaining,
+                (
+                    expected_remaining / hashes_per_second
+                    if hashes_per_second > 0
+                    else float("inf")
+                ),
+            )
+        )
+
+
+def point_to_message(point: int, num_bits: int) -> bytes:
+    """
+    Transforms a point of the walks of the collision searches, a hash or a
+    starting value, into the message that is hashed to get the next point.
+
+    Parameters
+    ----------
+    point : int
+        Point of the walk.
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+
+    Returns
+    -------
+    bytes
+        Message of the point, points smaller than 2 to the num_bits give
+        messages of the same length and bigger points longer ones, so
+        distinct points always give distinct messages.
+
+    """
+    return point.to_bytes(
+        max((num_bits + 7) // 8, (point.bit_length() + 7) // 8),
+        byteorder="big",
+    )
+
+
+def rho_collision(
+    num_bits: int, monitor: Optional[SearchMonitor] = None
+) -> Tuple[str, str, int]:
+    """
+    Searches two distinct messages with same hash iterating the hash over its
+    own output, the walk gets in a cycle and the two points that get into the
+    start of the cycle collide. The cycle is found with Brent's algorithm, so
+    only a few points are kept in memory.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    monitor : Optional[SearchMonitor], optional
+        Monitor updated every 1024 hashes of the walk. The default is None.
+
+    Returns
+    -------
+    Tuple[str, str, int]
+        Tuple including the messages we found that have the same hash and the
+        number of hashes calculated.
+
+    """
+    # The walk starts outside the hashes, so the start is never in the cycle
+    # and there is always a point before the start of the cycle.
+    start = 1 << num_bits
+    iterations = 1
+
+    power = cycle_length = 1
+    tortoise = start
+    hare = uab_md5_bytes(point_to_message(start, num_bits), num_bits)
+
+    while tortoise != hare:
+        if power == cycle_length:
+            tortoise = hare
+            power *= 2
+            cycle_length = 0
+
+        hare = uab_md5_bytes(point_to_message(hare, num_bits), num_bits)
+        cycle_length += 1
+        iterations += 1
+
+        if monitor is not None and not iterations & 0x3FF:
+            monitor.update(iterations, (num_bits + 7) // 8)
+
+    tortoise = hare = start
+    for _ in range(cycle_length):
+        hare = uab_md5_bytes(point_to_message(hare, num_bits), num_bits)
+        iterations += 1
+
+    while True:
+        next_tortoise = uab_md5_bytes(
+            point_to_message(tortoise, num_bits), num_bits
+        )
+        next_hare = uab_md5_bytes(point_to_message(hare, num_bits), num_bits)
+        iterations += 2
+
+        if next_tortoise == next_hare:
+            return (
+                point_to_message(tortoise, num_bits).decode("latin-1"),
+                point_to_message(hare, num_bits).decode("latin-1"),
+                iterations,
+            )
+
+        tortoise, hare = next_tortoise, next_hare
+
+
+def distinguished_walks(
+    num_bits: int, distinguished_bits: int, first_start: int, number: int
+) -> List[Tuple[int, Optional[int], int]]:
+    """
+    Iterates the hash over its own output from the given starts until getting
+    a distinguished point, a hash with the given number of leading zero bits.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    distinguished_bits : int
+        Number of leading zero bits of the distinguished points.
+    first_start : int
+        Start of the first walk, the rest start at the following numbers.
+    number : int
+        Number of walks.
+
+    Returns
+    -------
+    List[Tuple[int, Optional[int], int]]
+        For every walk, the start, the distinguished point reached, or None if
+        the walk was abandoned because it was too long, and the number of
+        hashes calculated.
+
+    """
+    max_length = 20 << distinguished_bits
+    shift = num_bits - distinguished_bits
+    walks = []
+
+    for start in range(first_start, first_start + number):
+        point = start
+        length = 0
+
+        while length < max_length:
+            point = uab_md5_bytes(point_to_message(point, num_bits), num_bits)
+            length += 1
+
+            if point >> shift == 0:
+                walks.append((start, point, length))
+                break
+        else:
+            walks.append((start, None, length))
+
+    return walks
+
+
+def distinguished_collision(
+    num_bits: int,
+    workers: Optional[int] = None,
+    monitor: Optional[SearchMonitor] = None,
+) -> Tuple[str, str, int]:
+    """
+    Searches two distinct messages with same hash with many walks of the hash
+    over its own output, as "rho_collision", keeping only the distinguished
+    points where the walks end. When two walks end in the same point they
+    are walked again to find where they merge, which is the collision. The
+    walks can be split between processes, the result is the same.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    workers : Optional[int], optional
+        Number of processes to split the walks between. The default is None,
+        walking in this process.
+    monitor : Optional[SearchMonitor], optional
+        Monitor updated after every task of walks. The default is None.
+
+    Returns
+    -------
+    Tuple[str, str, int]
+        Tuple including the messages we found that have the same hash and the
+        number of hashes calculated by the walks until the one that found the
+        collision, included, and to find where the two walks merge.
+
+    """
+    # Walks start outside the hashes, so a start is never in the middle of
+    # another walk and two walks with the same end always merge.
+    first_start = 1 << num_bits
+    distinguished_bits = max(0, num_bits // 2 - 8)
+    walks_per_task = max(1, 256 >> distinguished_bits)
+
+    distinguished_points = {}
+    iterations = 0
+
+    def results():
+        if workers is None or workers <= 1:
+            task_start = first_start
+            while True:
+                yield distinguished_walks(
+                    num_bits, distinguished_bits, task_start, walks_per_task
+                )
+                task_start += walks_per_task
+
+        with futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            task_start = first_start
+            pending = deque()
+
+            while True:
+                while len(pending) < 2 * workers:
+                    pending.append(
+                        executor.submit(
+                            distinguished_walks,
+                            num_bits,
+                            distinguished_bits,
+                            task_start,
+                            walks_per_task,
+                        )
+                    )
+                    task_start += walks_per_task
+
+                yield pending.popleft().result()
+
+    for walks in results():
+        if monitor is not None:
+            monitor.update(
+                iterations,
+                (num_bits + 7) // 8,
+                len(distinguished_points),
+                sys.getsizeof(distinguished_points),
+            )
+
+        for start, point, length in walks:
+            iterations += length
+
+            if point is None:
+                continue
+
+            if point not in distinguished_points:
+                distinguished_points[point] = (start, length)
+                continue
+
+            other_start, other_length = distinguished_points[point]
+
+            # Walk the longer one until both are at the same distance from the
+            # distinguished point, then walk both until they merge.
+            for _ in range(other_length - length):
+                other_start = uab_md5_bytes(
+                    point_to_message(other_start, num_bits), num_bits
+                )
+                iterations += 1
+
+            for _ in range(length - other_length):
+                start = uab_md5_bytes(
+                    point_to_message(start, num_bits), num_bits
+                )
+                iterations += 1
+
+            while True:
+                next_start = uab_md5_bytes(
+                    point_to_message(start, num_bits), num_bits
+                )
+                next_other_start = uab_md5_bytes(
+                    point_to_message(other_start, num_bits), num_bits
+                )
+                iterations += 2
+
+                if next_start == next_other_start:
+                    return (
+                        point_to_message(other_start, num_bits).decode(
+                            "latin-1"
+                        ),
+                        point_to_message(start, num_bits).decode("latin-1"),
+                        iterations,
+                    )
+
+                start, other_start = next_start, next_other_start
+
+
+def collision(
+    num_bits: int,
+    method: str = "birthday",
+    workers: Optional[int] = None,
+    checkpoint: Optional[str] = None,
+    checkpoint_interval: Optional[float] = 60.0,
+    checkpoint_iterations: Optional[int] = None,
+    resume: bool = False,
+    progress: Optional[Callable[[SearchProgress], None]] = None,
+    progress_interval: float = 1.0,
+) -> Optional[Tuple[str, str, int]]:
+    """
+    Given a number of bits of the hash to collision, searches two distinct
+    messages with same hash. Does so using brute force.
+
+    Parameters
+    ----------
+    num_bits : int
+        Number bits of the hash that we will try to collision with.
+    method : str, optional
+        Method used to search.
+        - birthday: tries every message in order, keeping the hash of all of
+          them in a "CompactHashIndex" until one is repeated.
+        - rho: iterates the hash over its own output until it gets in a
+          cycle, it does not keep the messages tried.
+        - distinguished: many walks like the rho one, keeping only the hashes
+          with leading zeros where they end, the walks can be done by many
+          processes.
+        The default is "birthday".
+    workers : Optional[int], optional
+        Number of processes to split the walks of the distinguished method
+        between, the result is the same as with only one. The default is
+        None, searching in this process.
+    checkpoint : Optional[str], optional
+        Path of the file where the progress of the birthday method, with the
+        table of the hashes, is saved from time to time. The default is None,
+        no checkpoints.
+    checkpoint_interval : Optional[float], optional
+        Seconds between checkpoints. The default is 60.0.
+    checkpoint_iterations : Optional[int], optional
+        Candidates tried between checkpoints, a checkpoint is saved when
+        either of both is reached. The default is None, only the time counts.
+    resume : bool, optional
+        Continue from the checkpoint file, if it exists, the result is the
+        same as searching from the start. The default is False.
+    progress : Optional[Callable[[SearchProgress], None]], optional
+        Function called with the progress of the search from time to time.
+        The default is None, no progress.
+    progress_interval : float, optional
+        Seconds between calls to progress. The default is 1.0.
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    Optional[Tuple[str, str, int]]
+        Tuple including the messages we found that have the same hash and the
+        number of iterations needed. If messages not found or error occurred
+        returns None.
+
+    """
+    if not isinstance(method, str):
+        raise TypeError("'method' is not a string.")
+
+    if method not in ("birthday", "rho", "distinguished"):
+        raise ValueError("'method' is not a valid value.")
+
+    if checkpoint is not None and method != "birthday":
+        raise ValueError("Only the birthday method has checkpoints.")
+
+    if not isinstance(num_bits, int) or not 1 <= num_bits <= 128:
+        return None
+
+    search_monitor = None
+    if progress is not None:
+        search_monitor = SearchMonitor(
+            progress, CHECKPOINT_COLLISION, num_bits, progress_interval
+        )
+
+    if method == "rho":
+        return rho_collision(num_bits, search_monitor)
+
+    if method == "distinguished":
+        return distinguished_collision(num_bits, workers, search_monitor)
+
+    space = CandidateSpace(min_length=0, max_length=9)
+    hash_index = CompactHashIndex(num_bits)
+
+    position = 0
+    search_checkpoint = None
+    if checkpoint is not None:
+        search_checkpoint = SearchCheckpoint(
+            checkpoint,
+            CHECKPOINT_COLLISION,
+            num_bits,
+            interval=checkpoint_interval,
+            iterations=checkpoint_iterations,
+        )
+
+        loaded = search_checkpoint.load() if resume else None
+        if loaded is not None:
+            position, hash_index = loaded
+
+    for start, messages in space.batches(position, packed=True):
+        if search_checkpoint is not None:
+            search_checkpoint.update(start, hash_index)
+
+        if search_monitor is not None:
+            search_monitor.update(
+                start, messages.shape[1], len(hash_index), hash_index.nbytes
+            )
+
+        for iterations, hash_val in zip(
+            count(start + 1),
+            uab_md5_packed(messages, messages.shape[1], num_bits).tolist(),
+        ):
+            index = hash_index.setdefault(hash_val, iterations - 1)
+
+            if index != iterations - 1 and (
+                num_bits <= 64
+                or uab_md5_bytes(space.candidate(index), num_bits) == hash_val
+            ):
+                return (
+                    space.candidate(index).decode("latin-1"),
+                    space.candidate(iterations - 1).decode("latin-1"),
+                    iterations,
+                )
+
+    return None
+
+
+def sweep_widths(
+    max_bits: int, message: str = "This is a benchmark"
+) -> List[Tuple[Optional[Tuple[str, int]], Optional[Tuple[str, str, int]]]]:
+    """
+    Searches a second preimage of the message and a collision for every
+    number of bits from 1 to max_bits, the same ones "second_preimage" and
+    "collision" would find, trying the candidates only once. The hash of
+    less bits is the start of the hash of more bits, so the hash of every
+    candidate is calculated once with max_bits and the searches of every
+    number of bits are answered from it, in order, as each one needs more
+    candidates than the one before.
+
+    Parameters
+    ----------
+    max_bits : int
+        Maximum number of bits, a value between 1 and 64.
+    message : str, optional
+        Original message of the second preimages. The default is
+        "This is a benchmark".
+
+    Raises
+    ------
+    TypeError
+        Paremeters given are not the proper Type.
+    ValueError
+        Values passed onto the paramenters are not inside the exepcted values.
+
+    Returns
+    -------
+    List[Tuple[Optional[Tuple[str, int]], Optional[Tuple[str, str, int]]]]
+        For every number of bits from 1 to max_bits, the result of
+        "second_preimage" of the message and the result of "collision".
+
+    """
+    # pylint: disable=too-many-locals
+    if not isinstance(max_bits, int):
+        raise TypeError("'max_bits' is not an integer.")
+
+    if not isinstance(message, str):
+        raise TypeError("'message' is not a string.")
+
+    if not 1 <= max_bits <= 64:
+        raise ValueError("'max_bits' is not between 1 and 64.")
+
+    # The candidates of the collisions start with b"", the ones of the second
+    # preimages are the same without it, so their iterations are the index.
+    space = CandidateSpace(min_length=0, max_length=9)
+    message_bytes = np.frombuffer(message_to_bytes(message), dtype=np.uint8)
+    to_match_hash = np.uint64(uab_md5(message, max_bits))
+    not_matching = np.uint64((1 << max_bits) - 1)
+
+    second_preimages = [None] * max_bits
+    collisions = [None] * max_bits
+    preimage_bits = collision_bits = 1
+
+    # Hashes of every candidate tried, to build the table of the collisions
+    # of the next number of bits when one is found.
+    hashes_tried = []
+    hash_index = CompactHashIndex(collision_bits)
+
+    for start, candidates in space.batches(0, packed=True):
+        if preimage_bits > max_bits and collision_bits > max_bits:
+            break
+
+        hashes = uab_md5_packed(candidates, candidates.shape[1], max_bits)
+
+        if preimage_bits <= max_bits:
+            differences = hashes ^ to_match_hash
+            if start == 0:
+                differences[0] = not_matching
+            if candidates.shape[1] == len(message_bytes):
+                differences[np.all(candidates == message_bytes, axis=1)] = (
+                    not_matching
+                )
+
+            while preimage_bits <= max_bits:
+                found = np.flatnonzero(
+                    differences >> np.uint64(max_bits - preimage_bits) == 0
+                )
+                if len(found) == 0:
+                    break
+
+                second_preimages[preimage_bits - 1] = (
+                    candidates[found[0]].tobytes().decode("latin-1"),
+                    start + int(found[0]),
+                )
+                preimage_bits += 1
+
+        if collision_bits > max_bits:
+            continue
+
+        hashes_tried.append(hashes)
+        shift = max_bits - collision_bits
+
+        for index, hash_val in enumerate(hashes.tolist(), start):
+            while collision_bits <= max_bits:
+                first_index = hash_index.setdefault(hash_val >> shift, index)
+                if first_index == index:
+                    break
+
+                collisions[collision_bits - 1] = (
+                    space.candidate(first_index).decode("latin-1"),
+                    space.candidate(index).decode("latin-1"),
+                    index + 1,
+                )
+                collision_bits += 1
+                if collision_bits > max_bits:
+                    break
+
+                shift -= 1
+
+                # The first candidate of every hash of the next number of
+                # bits, between the ones before this one.
+                hash_values, first_indexes = np.unique(
+                    np.concatenate(hashes_tried)[:index] >> np.uint64(shift),
+                    return_index=True,
+                )
+                hash_index = CompactHashIndex(
+                    collision_bits, 2 * len(hash_values)
+                )
+                for hash_value, first_index in zip(
+                    hash_values.tolist(), first_indexes.tolist()
+                ):
+                    hash_index.setdefault(hash_value, first_index)
+
+            if collision_bits > max_bits:
+                break
+
+    return list(zip(second_preimages, collisions))
+
+
+def graph_times(num_bits: int) -> DataFrame:
+    """
+    Graphs the time of the collison algorithms.
 
     Parameters
     ----------
@@ -844,6 +5218,10 @@ def graph_times(num_bits: int) -> DataFrame:
         Pandas dataframe with the iterations and times information gotten.
 
     """
+    # pylint: disable=import-outside-toplevel
+    import matplotlib.pyplot as plt
+    from pandas import DataFrame
+
     time_second_pre_image = []
     time_collision = []
 
@@ -912,3 +5290,146 @@ def graph_times(num_bits: int) -> DataFrame:
     print(table)
 
     return table
+
+
+def print_progress(progress: SearchProgress) -> None:
+    """
+    Prints the progress of a search in one line of the standard error.
+
+    Parameters
+    ----------
+    progress : SearchProgress
+        Progress of the search.
+
+    """
+    print(
+        f"{progress.candidates} candidates, "
+        f"{progress.hashes_per_second:.0f} hashes/s, "
+        f"length {progress.candidate_length}, "
+        f"table {progress.table_entries} ({progress.table_bytes} bytes), "
+        f"about {progress.expected_seconds:.0f} s left",
+        file=sys.stderr,
+    )
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the hash and the searches from the command line.
+
+    Parameters
+    ----------
+    argv : Optional[Sequence[str]], optional
+        Arguments of the command line. The default is None, the ones of the
+        process.
+
+    Returns
+    -------
+    int
+        Exit code, 1 if nothing was found, else 0.
+
+    """
+    # pylint: disable=import-outside-toplevel
+    import argparse
+
+    parser = argparse.ArgumentParser(
+        description="Truncated MD5 hash and brute force searches."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    hash_parser = subparsers.add_parser("hash", help="Hash a message.")
+    hash_parser.add_argument("message", nargs="?", default="")
+    hash_parser.add_argument("--bits", type=int, default=128)
+    hash_parser.add_argument("--file", help="Hash the file instead.")
+
+    second_preimage_parser = subparsers.add_parser(
+        "second-preimage", help="Search a second preimage of a message."
+    )
+    second_preimage_parser.add_argument("message")
+    second_preimage_parser.add_argument("--bits", type=int, required=True)
+    second_preimage_parser.add_argument("--table-directory")
+    second_preimage_parser.add_argument("--rainbow-table")
+
+    collision_parser = subparsers.add_parser(
+        "collision", help="Search two messages with the same hash."
+    )
+    collision_parser.add_argument("--bits", type=int, required=True)
+    collision_parser.add_argument(
+        "--method",
+        choices=("birthday", "rho", "distinguished"),
+        default="birthday",
+    )
+
+    for search_parser in (second_preimage_parser, collision_parser):
+        search_parser.add_argument("--workers", type=int)
+        search_parser.add_argument("--checkpoint")
+        search_parser.add_argument("--resume", action="store_true")
+        search_parser.add_argument(
+            "--progress",
+            type=float,
+            metavar="SECONDS",
+            help="Print the progress every given seconds.",
+        )
+
+    subparsers.add_parser(
+        "bench",
+        help="Run the benchmarks, see benchmark_hash.py --help.",
+        add_help=False,
+    )
+
+    # The arguments of the benchmarks are parsed by its own command line.
+    arguments, bench_arguments = parser.parse_known_args(argv)
+
+    if arguments.command == "bench":
+        import benchmark_hash
+
+        return benchmark_hash.main(bench_arguments)
+
+    if bench_arguments:
+        parser.error(f"unrecognized arguments: {' '.join(bench_arguments)}")
+
+    if arguments.command == "hash":
+        if arguments.file is not None:
+            hash_value = uab_md5_file(arguments.file, arguments.bits)
+        else:
+            hash_value = uab_md5(arguments.message, arguments.bits)
+
+        if hash_value is None:
+            return 1
+
+        print(f"{hash_value:0{(arguments.bits + 3) // 4}x}")
+        return 0
+
+    search_arguments = {
+        "workers": arguments.workers,
+        "checkpoint": arguments.checkpoint,
+        "resume": arguments.resume,
+    }
+    if arguments.progress is not None:
+        search_arguments["progress"] = print_progress
+        search_arguments["progress_interval"] = arguments.progress
+
+    if arguments.command == "second-preimage":
+        result = second_preimage(
+            arguments.message,
+            arguments.bits,
+            table_directory=arguments.table_directory,
+            rainbow_table=arguments.rainbow_table,
+            **search_arguments,
+        )
+    else:
+        result = collision(
+            arguments.bits, arguments.method, **search_arguments
+        )
+
+    if result is None:
+        return 1
+
+    for value in result[:-1]:
+        print(repr(value))
+    print(f"{result[-1]} iterations")
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,506 @@
+# -*- coding: utf-8 -*-
+"""
+Created on Sun Oct 18 15:02:37 2026
+
+@author: Joel Tapia Salvador
+
+Local server of hash jobs, with a pool of worker processes started once and
+a queue of jobs by priority. The clients connect to a Unix socket or to a
+localhost port and send one JSON object per line:
+
+    {"id": 1, "type": "second_preimage", "message": "abc", "num_bits": 20,
+     "priority": 0}
+
+The server answers with one JSON object per line for every event of the
+jobs, "queued", "started", "progress", "result" or "error", with the "id"
+of the job. Jobs with lower priority run first.
+"""
+from __future__ import annotations
+from typing import Dict, Iterator, List, Optional, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from itertools import count
+from math import isfinite
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+from main_hash import collision, second_preimage, uab_md5, uab_md5_batch
+
+SERVER_JOB_TYPES = ("hash", "second_preimage", "collision")
+
+SERVER_PROGRESS_QUEUE = None
+
+
+def json_value(value: object) -> object:
+    """
+    Transforms a value into one that is valid JSON, the numbers that are not
+    finite, such as the expected time of a search without speed yet, are
+    written as null.
+
+    Parameters
+    ----------
+    value : object
+        Value to transform, with lists, tuples and dictionaries inside.
+
+    Returns
+    -------
+    object
+        Value without numbers that are not finite.
+
+    """
+    if isinstance(value, float) and not isfinite(value):
+        return None
+
+    if isinstance(value, (list, tuple)):
+        return [json_value(item) for item in value]
+
+    if isinstance(value, dict):
+        return {key: json_value(item) for key, item in value.items()}
+
+    return value
+
+
+def strict_json_constant(constant: str) -> None:
+    """
+    Rejects the numbers that are not finite when reading JSON, which are not
+    valid JSON.
+
+    Parameters
+    ----------
+    constant : str
+        "NaN", "Infinity" or "-Infinity".
+
+    Raises
+    ------
+    ValueError
+        Always.
+
+    """
+    raise ValueError(f"'{constant}' is not valid JSON.")
+
+
+def init_server_worker(progress_queue) -> None:
+    """
+    Initiates a worker process of the server, saving the queue where the
+    progress of the jobs is sent and importing everything the jobs use, so
+    the first job does not wait for it.
+
+    Parameters
+    ----------
+    progress_queue : multiprocessing.Queue
+        Queue of the progress of the jobs.
+
+    Returns
+    -------
+    None.
+
+    """
+    global SERVER_PROGRESS_QUEUE  # pylint: disable=global-statement
+    SERVER_PROGRESS_QUEUE = progress_queue
+    uab_md5_batch([b""], 128)
+
+
+def warm_server_worker() -> int:
+    """
+    Does nothing, so the pool starts its processes before the first job.
+
+    Returns
+    -------
+    int
+        Identifier of the process.
+
+    """
+    return os.getpid()
+
+
+def run_job(job_key: int, job: dict, progress_interval: float) -> object:
+    """
+    Runs a job in a worker process, sending its progress to the queue of the
+    server.
+
+    Parameters
+    ----------
+    job_key : int
+        Key of the job in the server.
+    job : dict
+        Job, with its type and the arguments of the function.
+    progress_interval : float
+        Seconds between the progress of the searches.
+
+    Raises
+    ------
+    ValueError
+        The job is not valid.
+
+    Returns
+    -------
+    object
+        Result of the job, serializable to JSON.
+
+    """
+
+    def progress(search_progress) -> None:
+        SERVER_PROGRESS_QUEUE.put((job_key, search_progress._asdict()))
+
+    if job["type"] == "hash":
+        result = uab_md5(job["message"], job.get("num_bits", 128))
+    elif job["type"] == "second_preimage":
+        result = second_preimage(
+            job["message"],
+            job["num_bits"],
+            progress=progress,
+            progress_interval=progress_interval,
+        )
+    else:
+        result = collision(
+            job["num_bits"],
+            job.get("method", "birthday"),
+            progress=progress,
+            progress_interval=progress_interval,
+        )
+
+    if result is None:
+        raise ValueError("The job arguments are not valid.")
+
+    return result
+
+
+class HashServer:
+    """
+    Server of hash jobs, see the module documentation for the protocol.
+
+    Parameters
+    ----------
+    workers : Optional[int], optional
+        Number of worker processes, never more than the number of cores. The
+        default is None, as many as cores.
+    progress_interval : float, optional
+        Seconds between the progress of the searches. The default is 1.0.
+
+    """
+
+    def __init__(
+        self, workers: Optional[int] = None, progress_interval: float = 1.0
+    ):
+        cores = os.cpu_count() or 1
+        self.workers = cores if workers is None else min(workers, cores)
+        self.progress_interval = progress_interval
+        self.progress_queue = multiprocessing.Queue()
+        self.executor = None
+        self.server = None
+        self.queue = None
+        self.tasks = []
+        self.jobs = {}
+        self.keys = count()
+
+    async def start(
+        self,
+        path: Optional[str] = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ) -> None:
+        """
+        Starts the worker processes and listens to the clients.
+
+        Parameters
+        ----------
+        path : Optional[str], optional
+            Path of the Unix socket. The default is None, listening to a
+            port of the host instead.
+        host : str, optional
+            Host to listen to. The default is "127.0.0.1".
+        port : int, optional
+            Port to listen to. The default is 0, any free one, see
+            "addresses".
+
+        """
+        loop = asyncio.get_running_loop()
+        self.executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            initializer=init_server_worker,
+            initargs=(self.progress_queue,),
+        )
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(self.executor, warm_server_worker)
+                for _ in range(self.workers)
+            )
+        )
+
+        self.queue = asyncio.PriorityQueue()
+        self.tasks = [
+            asyncio.ensure_future(self.dispatch())
+            for _ in range(self.workers)
+        ]
+        self.tasks.append(asyncio.ensure_future(self.forward_progress()))
+
+        if path is not None:
+            self.server = await asyncio.start_unix_server(
+                self.handle_client, path
+            )
+        else:
+            self.server = await asyncio.start_server(
+                self.handle_client, host, port
+            )
+
+    @property
+    def addresses(self) -> List[object]:
+        """
+        Addresses the server listens to.
+
+        Returns
+        -------
+        List[object]
+            Path of the Unix socket or host and port of every socket.
+
+        """
+        return [sock.getsockname() for sock in self.server.sockets]
+
+    async def close(self) -> None:
+        """
+        Stops listening and stops the worker processes, after the jobs being
+        run finish.
+
+        """
+        self.server.close()
+        await self.server.wait_closed()
+
+        # Waiting for the jobs being run must not block the event loop, so
+        # their progress and their results are still written meanwhile.
+        await asyncio.get_running_loop().run_in_executor(
+            None, self.executor.shutdown
+        )
+
+        for task in self.tasks[:-1]:
+            task.cancel()
+
+        # The end of the queue stops the forwarding of the progress.
+        self.progress_queue.put(None)
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+
+    async def handle_client(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        """
+        Reads the jobs of a client and queues them, the events are written
+        back by "send".
+
+        Parameters
+        ----------
+        reader : asyncio.StreamReader
+            Stream from the client.
+        writer : asyncio.StreamWriter
+            Stream to the client.
+
+        """
+        pending = set()
+
+        while line := await reader.readline():
+            job = None
+            try:
+                job = json.loads(line)
+                if not isinstance(job, dict):
+                    raise ValueError("The job is not a JSON object.")
+                if job.get("type") not in SERVER_JOB_TYPES:
+                    raise ValueError(f"'{job.get('type')}' is not a job.")
+                priority = job.get("priority", 0)
+                if isinstance(priority, bool) or not isinstance(
+                    priority, (int, float)
+                ):
+                    raise ValueError("The priority is not a number.")
+            except ValueError as error:
+                self.send(
+                    writer,
+                    job.get("id") if isinstance(job, dict) else None,
+                    "error",
+                    error=str(error),
+                )
+                await writer.drain()
+                continue
+
+            key = next(self.keys)
+            done = asyncio.get_running_loop().create_future()
+            self.jobs[key] = (job, writer, done)
+            pending.add(done)
+            self.queue.put_nowait((priority, key))
+            self.send(writer, job.get("id"), "queued")
+            await writer.drain()
+
+        await asyncio.gather(*pending)
+        writer.close()
+        await writer.wait_closed()
+
+    def send(
+        self,
+        writer: asyncio.StreamWriter,
+        job_id: object,
+        event: str,
+        **fields,
+    ) -> None:
+        """
+        Writes an event of a job to its client.
+
+        Parameters
+        ----------
+        writer : asyncio.StreamWriter
+            Stream to the client.
+        job_id : object
+            Identifier of the job given by the client.
+        event : str
+            Event of the job.
+        **fields
+            Data of the event.
+
+        """
+        if writer.is_closing():
+            return
+
+        writer.write(
+            json.dumps(
+                json_value({"id": job_id, "event": event, **fields}),
+                allow_nan=False,
+            ).encode()
+            + b"\n"
+        )
+
+    async def dispatch(self) -> None:
+        """
+        Runs the jobs of the queue in the worker processes, one at a time.
+
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            _, key = await self.queue.get()
+            job, writer, done = self.jobs[key]
+            self.send(writer, job.get("id"), "started")
+
+            try:
+                result = await loop.run_in_executor(
+                    self.executor,
+                    run_job,
+                    key,
+                    job,
+                    self.progress_interval,
+                )
+            except Exception as error:  # pylint: disable=broad-except
+                self.send(writer, job.get("id"), "error", error=str(error))
+            else:
+                self.send(writer, job.get("id"), "result", result=result)
+            finally:
+                del self.jobs[key]
+                done.set_result(None)
+
+    async def forward_progress(self) -> None:
+        """
+        Writes the progress sent by the worker processes to the clients.
+
+        """
+        loop = asyncio.get_running_loop()
+
+        while True:
+            item = await loop.run_in_executor(None, self.progress_queue.get)
+            if item is None:
+                return
+
+            key, progress = item
+            if key in self.jobs:
+                job, writer, _ = self.jobs[key]
+                self.send(writer, job.get("id"), "progress", **progress)
+
+
+def submit_jobs(
+    jobs: Sequence[dict],
+    path: Optional[str] = None,
+    host: str = "127.0.0.1",
+    port: Optional[int] = None,
+) -> Iterator[Dict[str, object]]:
+    """
+    Sends jobs to a server and yields its events until every job has its
+    result or its error.
+
+    Parameters
+    ----------
+    jobs : Sequence[dict]
+        Jobs to send.
+    path : Optional[str], optional
+        Path of the Unix socket of the server. The default is None, using
+        the host and the port instead.
+    host : str, optional
+        Host of the server. The default is "127.0.0.1".
+    port : Optional[int], optional
+        Port of the server. The default is None.
+
+    Yields
+    ------
+    Dict[str, object]
+        Events of the jobs.
+
+    Raises
+    ------
+    ValueError
+        An event of the server is not valid JSON.
+
+    """
+    if path is not None:
+        connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        connection.connect(path)
+    else:
+        connection = socket.create_connection((host, port))
+
+    with connection, connection.makefile("rwb") as stream:
+        for job in jobs:
+            stream.write(json.dumps(job).encode() + b"\n")
+        stream.flush()
+        connection.shutdown(socket.SHUT_WR)
+
+        for line in stream:
+            yield json.loads(line, parse_constant=strict_json_constant)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    """
+    Runs the server from the command line until it is interrupted.
+
+    Parameters
+    ----------
+    argv : Optional[Sequence[str]], optional
+        Arguments of the command line. The default is None, the ones of the
+        process.
+
+    Returns
+    -------
+    int
+        Exit code.
+
+    """
+    parser = argparse.ArgumentParser(description="Local hash job server.")
+    parser.add_argument("--socket", help="Path of the Unix socket.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--progress-interval", type=float, default=1.0)
+    arguments = parser.parse_args(argv)
+
+    async def serve() -> None:
+        server = HashServer(arguments.workers, arguments.progress_interval)
+        await server.start(arguments.socket, arguments.host, arguments.port)
+        print(f"Listening on {server.addresses}", flush=True)
+
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await server.close()
+
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
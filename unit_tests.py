@@ -4,8 +4,59 @@ Created on Mon Apr 29 15:22:10 2024
 
 @author: Joel Tapia Salvador 
 """
+import asyncio
+import contextlib
+import hashlib
+import io
+import os
+import subprocess
+import sys
+import tempfile
 import unittest
-from main_hash import uab_md5, second_preimage, collision
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product, repeat
+from async_hash import (
+    collision_async,
+    second_preimage_async,
+    SearchTimeoutError,
+)
+from benchmark_hash import (
+    benchmark_collision,
+    benchmark_hash,
+    benchmark_second_preimage,
+    compare_results,
+    load_results,
+    save_results,
+)
+from main_hash import (
+    HASH_MODES,
+    DIGEST_CACHE_MAX_BYTES,
+    DIGEST_CACHE_MAX_ENTRIES,
+    clear_digest_cache,
+    configure_digest_cache,
+    digest_cache_info,
+    get_hash_mode,
+    set_hash_mode,
+    build_preimage_table,
+    build_rainbow_table,
+    CandidateSpace,
+    CompactHashIndex,
+    open_rainbow_table,
+    UabMd5,
+    uab_md5,
+    uab_md5_batch,
+    uab_md5_batch_matches,
+    uab_md5_file,
+    uab_md5_packed,
+    uab_md5_stream,
+    uab_md5_reference,
+    second_preimage,
+    second_preimage_many,
+    collision,
+    main,
+    sweep_widths,
+)
+from server_hash import HashServer, json_value, submit_jobs
 
 
 class TestLab1(unittest.TestCase):
@@ -19,9 +70,128 @@ class TestLab1(unittest.TestCase):
             ["Alexandria", 129, None],
             ["Alexandria", 0, None],
         )
-        for t in test_vectors_ok:
-            my_value = uab_md5(t[0], t[1])
-            self.assertEqual(my_value, t[2])
+        try:
+            for mode in HASH_MODES:
+                for t in test_vectors_ok:
+                    my_value = uab_md5(t[0], t[1], mode=mode)
+                    self.assertEqual(my_value, t[2])
+                set_hash_mode(mode)
+                self.assertEqual(get_hash_mode(), mode)
+                for t in test_vectors_ok:
+                    my_value = uab_md5(t[0], t[1])
+                    self.assertEqual(my_value, t[2])
+                    my_value = uab_md5(t[0].encode(), t[1])
+                    self.assertEqual(my_value, t[2])
+        finally:
+            set_hash_mode("fast")
+        self.assertIsNone(uab_md5("hola", 8, mode="slow"))
+        with self.assertRaises(ValueError):
+            set_hash_mode("slow")
+
+    def test_uab_md5_reference(self):
+        messages = ("", "hola", "a" * 55, "b" * 56, "c" * 64, "\xff\x00" * 70)
+        for message in messages:
+            for n in range(1, 129):
+                self.assertEqual(
+                    uab_md5(message, n), uab_md5_reference(message, n)
+                )
+
+    def test_uab_md5_incremental(self):
+        msg = "A shared prefix longer than one chunk, " * 3
+        prefix = UabMd5(msg)
+        for suffix in ("", "a", "suffix of another length" * 4):
+            new_hash = prefix.copy()
+            new_hash.update(suffix)
+            self.assertEqual(new_hash.digest(40), uab_md5(msg + suffix, 40))
+
+        new_hash = UabMd5()
+        new_hash.set_state(*prefix.get_state())
+        self.assertEqual(new_hash.digest(), prefix.digest())
+
+    def test_uab_md5_batch(self):
+        msgs = ["%07d" % i for i in range(1000)]
+        for n in (1, 20, 32, 33, 64, 65, 128):
+            hashes = uab_md5_batch(msgs, n)
+            for msg, my_value in zip(msgs, hashes):
+                self.assertEqual(int(my_value), uab_md5(msg, n))
+
+        with self.assertRaises(ValueError):
+            uab_md5_batch(["short", "long" * 20], 32)
+
+    def test_uab_md5_batch_matches(self):
+        msgs = ["%07d" % i for i in range(1000)]
+        for n in (1, 12, 32, 40, 64, 100, 128):
+            hashes = uab_md5_batch(msgs, n)
+            for target in (int(hashes[0]), int(hashes[500])):
+                self.assertEqual(
+                    list(uab_md5_batch_matches(msgs, n, target)),
+                    [int(my_value) == target for my_value in hashes],
+                )
+
+    def test_uab_md5_packed(self):
+        msgs = [b"%07d" % i for i in range(1000)]
+        for n in (1, 32, 64, 128):
+            hashes = uab_md5_packed(b"".join(msgs), 7, n)
+            for msg, my_value in zip(msgs, hashes):
+                self.assertEqual(int(my_value), uab_md5(msg, n))
+
+        space = CandidateSpace(min_length=1, max_length=3, alphabet=b"xyz")
+        for start in range(space.number_candidates):
+            batch = space.packed_batch(start, 5)
+            self.assertEqual(
+                [record.tobytes() for record in batch],
+                space.batch(start, len(batch)),
+            )
+            self.assertEqual(
+                list(uab_md5_packed(batch, batch.shape[1], 16)),
+                [uab_md5(record.tobytes(), 16) for record in batch],
+            )
+
+        for length in range(1, 65):
+            msgs = [bytes([i]) * length for i in range(3)]
+            hashes = uab_md5_packed(b"".join(msgs), length, 128)
+            for msg, my_value in zip(msgs, hashes.tolist()):
+                self.assertEqual(my_value, uab_md5(msg, 128))
+
+        with self.assertRaises(ValueError):
+            uab_md5_packed(b"12345", 2, 16)
+
+    def test_uab_md5_file(self):
+        data = bytes(range(256)) * 1000 + b"end"
+        my_value = uab_md5(data.decode("latin-1"), 128)
+        self.assertEqual(uab_md5(data, 128), my_value)
+        self.assertEqual(uab_md5(bytearray(data), 128), my_value)
+        self.assertEqual(uab_md5(memoryview(data), 128), my_value)
+        self.assertEqual(
+            uab_md5(memoryview(data)[::2], 128), uab_md5(data[::2], 128)
+        )
+        self.assertEqual(
+            uab_md5_stream(io.BytesIO(data), 128, chunk_size=1000), my_value
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "data.bin")
+            with open(path, "wb") as file:
+                file.write(data)
+            self.assertEqual(uab_md5_file(path, 128), my_value)
+
+            path = os.path.join(directory, "empty.bin")
+            open(path, "wb").close()
+            self.assertEqual(uab_md5_file(path, 64), uab_md5("", 64))
+            with self.assertRaises(ValueError):
+                uab_md5_file(path, 0)
+        if os.path.isdir("/dev/fd"):
+            read_end, write_end = os.pipe()
+            os.write(write_end, b"abc" * 1000)
+            os.close(write_end)
+            try:
+                self.assertEqual(
+                    uab_md5_file(f"/dev/fd/{read_end}", 128),
+                    int(hashlib.md5(b"abc" * 1000).hexdigest(), 16),
+                )
+            finally:
+                os.close(read_end)
+        with self.assertRaises(ValueError):
+            uab_md5_stream(io.BytesIO(data), 129)
 
     def test_second_preimage(self):
         msg = "find a second preimage"
@@ -30,11 +200,401 @@ class TestLab1(unittest.TestCase):
             self.assertEqual(uab_md5(new_msg, n), uab_md5(msg, n))
             self.assertNotEqual(new_msg, msg)
 
+    def test_second_preimage_workers(self):
+        msg = "find a second preimage"
+        for n in (1, 14, 18):
+            self.assertEqual(
+                second_preimage(msg, n, workers=2), second_preimage(msg, n)
+            )
+
     def test_collision(self):
         for n in range(1, 15):
             msg1, msg2, _ = collision(n)
             self.assertEqual(uab_md5(msg1, n), uab_md5(msg2, n))
             self.assertNotEqual(msg1, msg2)
 
+    def test_collision_rho(self):
+        for n in range(1, 25):
+            msg1, msg2, _ = collision(n, method="rho")
+            self.assertEqual(uab_md5(msg1, n), uab_md5(msg2, n))
+            self.assertNotEqual(msg1, msg2)
+
+    def test_collision_distinguished(self):
+        for n in range(1, 25):
+            msg1, msg2, _ = collision(n, method="distinguished")
+            self.assertEqual(uab_md5(msg1, n), uab_md5(msg2, n))
+            self.assertNotEqual(msg1, msg2)
+
+        self.assertEqual(
+            collision(24, method="distinguished", workers=2),
+            collision(24, method="distinguished"),
+        )
+
+    def test_compact_hash_index(self):
+        hash_index = CompactHashIndex(32, capacity=8)
+        hash_dict = {}
+        for index, msg in enumerate("%05d" % i for i in range(5000)):
+            key = uab_md5(msg, 16)
+            self.assertEqual(
+                hash_index.setdefault(key, index),
+                hash_dict.setdefault(key, index),
+            )
+        self.assertEqual(len(hash_index), len(hash_dict))
+        for key, index in hash_dict.items():
+            self.assertEqual(hash_index.get(key), index)
+        self.assertIsNone(hash_index.get(1 << 20))
+
+    def test_candidate_space(self):
+        space = CandidateSpace(min_length=1, max_length=3, alphabet=b"xyz")
+        candidates = [
+            bytes(x) for i in range(1, 4) for x in product(b"xyz", repeat=i)
+        ]
+        self.assertEqual(space.number_candidates, len(candidates))
+        for index, candidate in enumerate(candidates):
+            self.assertEqual(space.candidate(index), candidate)
+            self.assertEqual(space.index(candidate), index)
+            self.assertEqual(space.batch(index, 7), candidates[index:][:7])
+        self.assertEqual(
+            [x for _, batch in space.batches(batch_size=4) for x in batch],
+            candidates,
+        )
+        with self.assertRaises(IndexError):
+            space.candidate(len(candidates))
+
+    def test_checkpoint_resume(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "collision.ckpt")
+            result = collision(22, checkpoint=path, checkpoint_iterations=500)
+            self.assertTrue(os.path.exists(path))
+            self.assertEqual(
+                collision(22, checkpoint=path, resume=True), result
+            )
+
+            path = os.path.join(directory, "preimage.ckpt")
+            msg = "find a second preimage"
+            result = second_preimage(
+                msg, 20, checkpoint=path, checkpoint_iterations=100000
+            )
+            self.assertTrue(os.path.exists(path))
+            self.assertEqual(
+                second_preimage(msg, 20, checkpoint=path, resume=True), result
+            )
+            with self.assertRaises(ValueError):
+                second_preimage("other", 20, checkpoint=path, resume=True)
+            self.assertEqual(
+                second_preimage("other", 20, checkpoint=path),
+                second_preimage("other", 20),
+            )
+            self.assertIsNone(second_preimage(msg, 0, checkpoint=path))
+            self.assertTrue(os.path.exists(path))
+
+    def test_preimage_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            build_preimage_table(12, directory)
+            build_preimage_table(16, directory, max_iterations=20000)
+            for n in (12, 16):
+                for msg in ("find a second preimage", "\x01", "abc", "x"):
+                    self.assertEqual(
+                        second_preimage(msg, n, table_directory=directory),
+                        second_preimage(msg, n),
+                    )
+
+    def test_rainbow_table(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = build_rainbow_table(
+                14,
+                os.path.join(directory, "rainbow"),
+                success_probability=0.99,
+                workers=2,
+            )
+            table = open_rainbow_table(path)
+            found = 0
+            for msg in ("find a second preimage", "\x01", "abc", "x"):
+                candidate, _ = table.lookup(uab_md5(msg, 14), msg.encode())
+                if candidate is not None:
+                    found += 1
+                    self.assertNotEqual(candidate, msg.encode())
+                    self.assertEqual(uab_md5(candidate, 14), uab_md5(msg, 14))
+                result = second_preimage(msg, 14, rainbow_table=path)
+                self.assertNotEqual(result[0], msg)
+                self.assertEqual(uab_md5(result[0], 14), uab_md5(msg, 14))
+            self.assertGreater(found, 0)
+            with self.assertRaises(ValueError):
+                build_rainbow_table(57, path)
+
+            path = build_rainbow_table(
+                12,
+                os.path.join(directory, "rainbow_12"),
+                success_probability=0.9,
+            )
+            table = open_rainbow_table(path)
+            found = sum(
+                table.lookup(uab_md5(str(i), 12))[0] is not None
+                for i in range(300)
+            )
+            self.assertGreaterEqual(found / 300, 0.87)
+
+    def test_benchmark(self):
+        results = (
+            benchmark_hash((0, 100), number=10, warmups=0, trials=3)
+            + benchmark_second_preimage((4, 8), warmups=0, trials=3)
+            + benchmark_collision((8,), "rho", warmups=0, trials=3)
+        )
+        self.assertEqual(len(results), 5)
+        self.assertEqual(
+            results[2].hashes, second_preimage("This is a benchmark", 4)[1]
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for name in ("results.json", "results.csv"):
+                path = os.path.join(directory, name)
+                save_results(results, path)
+                self.assertEqual(load_results(path), results)
+        self.assertFalse(
+            any(row["regression"] for row in compare_results(results, results))
+        )
+        faster = [
+            result._replace(
+                median=result.median / 4,
+                first_quartile=result.median / 4,
+                third_quartile=result.median / 4,
+            )
+            for result in results
+        ]
+        self.assertTrue(
+            all(row["regression"] for row in compare_results(results, faster))
+        )
+
+    def test_progress(self):
+        reports = []
+        self.assertEqual(
+            second_preimage(
+                "abc", 16, progress=reports.append, progress_interval=0.0
+            ),
+            second_preimage("abc", 16),
+        )
+        self.assertGreater(len(reports), 1)
+        self.assertEqual(
+            [report.candidates for report in reports],
+            sorted(report.candidates for report in reports),
+        )
+        self.assertEqual(reports[-1].expected_remaining, 2**16)
+        for method in ("birthday", "rho", "distinguished"):
+            reports = []
+            self.assertEqual(
+                collision(
+                    24,
+                    method,
+                    progress=reports.append,
+                    progress_interval=0.0,
+                ),
+                collision(24, method),
+            )
+            self.assertGreater(len(reports), 1)
+            self.assertLess(
+                reports[-1].expected_remaining,
+                reports[0].expected_remaining,
+            )
+        self.assertGreater(reports[-1].table_entries, 0)
+
+    def test_main(self):
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            self.assertEqual(main(["hash", "abc"]), 0)
+            self.assertEqual(main(["hash", "abc", "--bits", "20"]), 0)
+            self.assertEqual(
+                main(["second-preimage", "abc", "--bits", "12"]), 0
+            )
+        lines = output.getvalue().splitlines()
+        self.assertEqual(lines[0], f"{uab_md5('abc', 128):032x}")
+        self.assertEqual(lines[1], f"{uab_md5('abc', 20):05x}")
+        result = second_preimage("abc", 12)
+        self.assertEqual(
+            lines[2:], [repr(result[0]), f"{result[1]} iterations"]
+        )
+        imported = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                "import sys, main_hash; main_hash.uab_md5('abc', 128); "
+                "print(sorted({'numpy', 'pandas', 'matplotlib'} "
+                "& set(sys.modules)))",
+            ],
+            cwd=os.path.dirname(os.path.abspath(__file__)),
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        self.assertEqual(imported.stdout.strip(), "[]")
+
+    def test_async(self):
+        async def searches():
+            return await asyncio.gather(
+                second_preimage_async("abc", 12),
+                second_preimage_async("abc", 16, chunk_size=1000),
+                collision_async(20),
+            )
+
+        self.assertEqual(
+            asyncio.run(searches()),
+            [
+                second_preimage("abc", 12),
+                second_preimage("abc", 16),
+                collision(20),
+            ],
+        )
+
+        reports = []
+
+        async def timed_out():
+            await second_preimage_async(
+                "abc", 60, timeout=0.2, progress=reports.append
+            )
+
+        with self.assertRaises(SearchTimeoutError) as context:
+            asyncio.run(timed_out())
+        self.assertEqual(reports[-1].candidates, context.exception.iterations)
+
+        reports.clear()
+
+        async def cancelled():
+            search = asyncio.ensure_future(
+                collision_async(80, progress=reports.append)
+            )
+            await asyncio.sleep(0.2)
+            search.cancel()
+            await search
+
+        with self.assertRaises(asyncio.CancelledError):
+            asyncio.run(cancelled())
+        self.assertEqual(len(reports), 1)
+
+    def test_server(self):
+        jobs = [
+            {
+                "id": 1,
+                "type": "second_preimage",
+                "message": "abc",
+                "num_bits": 16,
+            },
+            {"id": 2, "type": "hash", "message": "abc", "priority": 5},
+            {"id": 3, "type": "collision", "num_bits": 20, "priority": -1},
+            {"id": 4, "type": "unknown"},
+            {"id": 5, "type": "hash", "message": "abc", "priority": "high"},
+        ]
+
+        async def serve(path):
+            server = HashServer(workers=1, progress_interval=0.0)
+            await server.start(path)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(
+                    None, lambda: list(submit_jobs(jobs, path))
+                )
+            finally:
+                await server.close()
+
+        with tempfile.TemporaryDirectory() as directory:
+            events = asyncio.run(serve(os.path.join(directory, "socket")))
+        results = {
+            event["id"]: event["result"]
+            for event in events
+            if event["event"] == "result"
+        }
+        self.assertEqual(
+            results,
+            {
+                1: list(second_preimage("abc", 16)),
+                2: uab_md5("abc", 128),
+                3: list(collision(20)),
+            },
+        )
+        self.assertIn(
+            {"id": 4, "event": "error", "error": "'unknown' is not a job."},
+            events,
+        )
+        self.assertIn(
+            {
+                "id": 5,
+                "event": "error",
+                "error": "The priority is not a number.",
+            },
+            events,
+        )
+        started = [
+            event["id"] for event in events if event["event"] == "started"
+        ]
+        self.assertLess(started.index(3), started.index(2))
+        self.assertTrue(any(event["event"] == "progress" for event in events))
+        self.assertEqual(
+            json_value({"times": (float("inf"), float("nan"), 1.5)}),
+            {"times": [None, None, 1.5]},
+        )
+
+    def test_second_preimage_many(self):
+        messages = ["abc", "\x01", "abc", "x", "", "\x01\x02", "y" * 70]
+        for n in (4, 8, 12):
+            self.assertEqual(
+                second_preimage_many(messages, n),
+                [second_preimage(msg, n) for msg in messages],
+            )
+        results = second_preimage_many(messages, 12, max_iterations=3000)
+        for msg, result in zip(messages, results):
+            expected = second_preimage(msg, 12)
+            self.assertEqual(
+                result, expected if expected[1] <= 3000 else None
+            )
+        self.assertEqual(second_preimage_many(messages, 0), [None] * 7)
+
+    def test_sweep_widths(self):
+        for msg in ("This is a benchmark", "\x05", ""):
+            expected = [
+                (second_preimage(msg, n), collision(n)) for n in range(1, 15)
+            ]
+            self.assertEqual(sweep_widths(14, msg), expected)
+        with self.assertRaises(ValueError):
+            sweep_widths(65)
+        with self.assertRaises(TypeError):
+            sweep_widths(8, b"abc")
+
+    def test_digest_cache(self):
+        messages = ["This is a benchmark", "abc", b"abc", "", "x" * 100]
+        expected = [
+            [uab_md5(msg, n) for n in range(1, 129)] for msg in messages
+        ]
+        try:
+            configure_digest_cache(max_entries=8, max_bytes=1 << 10)
+            clear_digest_cache()
+            for _ in range(2):
+                self.assertEqual(
+                    [
+                        [uab_md5(msg, n) for n in range(1, 129)]
+                        for msg in messages
+                    ],
+                    expected,
+                )
+            info = digest_cache_info()
+            self.assertEqual((info.misses, info.entries), (4, 4))
+            self.assertEqual(info.hits, 2 * 128 * 5 - 4)
+            configure_digest_cache(max_entries=2)
+            self.assertEqual(digest_cache_info().entries, 2)
+            configure_digest_cache(max_bytes=100)
+            self.assertLessEqual(digest_cache_info().nbytes, 100)
+            uab_md5("y" * 200, 8)
+            self.assertLessEqual(digest_cache_info().nbytes, 100)
+            configure_digest_cache(False)
+            uab_md5("abc", 8)
+            self.assertEqual(digest_cache_info().hits, info.hits)
+            configure_digest_cache(max_entries=4, max_bytes=1 << 10)
+            messages = ["%d" % (i % 16) for i in range(4000)]
+            with ThreadPoolExecutor(4) as executor:
+                self.assertEqual(
+                    list(executor.map(uab_md5, messages, repeat(32))),
+                    [uab_md5_reference(msg, 32) for msg in messages],
+                )
+        finally:
+            configure_digest_cache(
+                False, DIGEST_CACHE_MAX_ENTRIES, DIGEST_CACHE_MAX_BYTES
+            )
+            clear_digest_cache()
+
 
 unittest.main(argv=[""], verbosity=2, exit=False, buffer=True)